@@ -1,20 +1,70 @@
 import streamlit as st
 import pandas as pd
 from text_analyzer import (
-    clean_text, tokenize, analyze, extractive_summarizer, 
-    wcg, get_abstractive_summarizer
+    Document, clean_text, tokenize, cached_analyze, cached_summarize,
+    wcg, abstractive_jobs, iter_text_chunks, summarize_stream
 )
 from database import (
-    create_post, get_all_posts, get_post_by_id, create_review,
-    get_reviews_by_post, get_post_analytics, get_posts_by_author,
+    create_post, get_post_by_id, create_review, list_posts, list_reviews,
+    get_reviews_by_post, get_posts_analytics, get_author_dashboard,
     create_user, authenticate_user, check_username_exists, check_email_exists,
-    get_role_based_summary
+    get_role_based_summary, get_top_review_words, get_review_digest, request_scope,
+    get_author_sentiment_trend, get_posts_sentiment_trends
 )
-import matplotlib.pyplot as plt
-from io import BytesIO
-import base64
+from pipeline import Pipeline
+from search import MAX_SEARCH_PAGE, search_posts, search_reviews
+import uuid
 from datetime import datetime
 
+# Uploads larger than this are summarized as a stream instead of read into memory
+LARGE_UPLOAD_BYTES = 5 * 1024 * 1024
+POSTS_PAGE_SIZE = 20
+REVIEWS_PAGE_SIZE = 10
+# How often the word cloud checks whether its full-resolution render is done
+WORDCLOUD_POLL_SECONDS = 1
+
+def show_wordcloud(frequencies, options, polling):
+    """Word cloud panel: the full render once it is ready, the preview until then"""
+    wc_render = wcg.render_progressive(frequencies, **options)
+    if wc_render.get('error'):
+        st.error(f"Unable to generate word cloud: {wc_render['error']}")
+    elif wc_render['done']:
+        if polling:
+            # Full render just finished; rerun the page so this panel stops polling
+            st.rerun()
+        st.image(wc_render['image'], caption="Generated Word Cloud")
+        if wc_render['timings'].get('full') is not None:
+            st.caption(f"Full render: {wc_render['timings']['full']:.2f}s")
+
+        # Download button for word cloud
+        st.download_button(
+            label="📥 Download Word Cloud",
+            data=wc_render['png'],
+            file_name="wordcloud.png",
+            mime="image/png"
+        )
+    else:
+        st.image(wc_render['image'], caption="Preview - full resolution is rendering", width=options['width'])
+        st.caption(f"Preview render: {wc_render['timings']['preview']:.2f}s")
+
+def paginate(state_key, fetch_page):
+    """Render Previous/Next controls for a cursor-paginated listing and return the current page's items"""
+    # Stack of cursors for the pages visited so far; None is the first page
+    cursors = st.session_state.setdefault(state_key, [None])
+    page = fetch_page(cursors[-1])
+    col_prev, col_page, col_next = st.columns([1, 2, 1])
+    with col_prev:
+        if len(cursors) > 1 and st.button("⬅️ Previous", key=f"{state_key}_prev"):
+            cursors.pop()
+            st.rerun()
+    with col_page:
+        st.caption(f"Page {len(cursors)}")
+    with col_next:
+        if page['next_cursor'] and st.button("Next ➡️", key=f"{state_key}_next"):
+            cursors.append(page['next_cursor'])
+            st.rerun()
+    return page['items']
+
 # Configure page
 st.set_page_config(
     page_title="Text Analysis Tool",
@@ -129,6 +179,7 @@ if app_mode == "Text Analysis":
     input_method = st.radio("Choose input method:", ["Type/Paste Text", "Upload File"])
 
     text_input = ""
+    large_upload = False
     if input_method == "Type/Paste Text":
         text_input = st.text_area(
             "Enter your text here:",
@@ -141,30 +192,61 @@ if app_mode == "Text Analysis":
             
     elif input_method == "Upload File":
         uploaded_file = st.file_uploader("Upload a text file", type=['txt'])
-        if uploaded_file is not None:
+        if uploaded_file is not None and uploaded_file.size > LARGE_UPLOAD_BYTES:
+            large_upload = True
+            st.info(f"📦 Large file ({uploaded_file.size / (1024 * 1024):.1f} MB): showing a streaming extractive summary only.")
+            # Streamlit reruns the script on every interaction; summarize each upload once
+            stream_key = ('stream_summary', uploaded_file.name, uploaded_file.size)
+            if st.session_state.get('stream_summary_key') != stream_key:
+                with st.spinner("Summarizing large file..."):
+                    uploaded_file.seek(0)
+                    st.session_state['stream_summary'] = summarize_stream(iter_text_chunks(uploaded_file), max_length=250)
+                    st.session_state['stream_summary_key'] = stream_key
+            st.write("**🎯 Extractive Summary**")
+            st.text_area("", value=st.session_state['stream_summary'], height=200, disabled=True)
+        elif uploaded_file is not None:
             text_input = str(uploaded_file.read(), "utf-8")
             st.text_area("Uploaded text:", value=text_input, height=200, disabled=True)
 
     # Only proceed if there's text input
     if text_input and text_input.strip():
+        # Every analysis stage is memoized in the session, keyed by the text hash,
+        # its parameters and its upstream stages: a rerun caused by an unrelated
+        # widget recomputes nothing, a slider change recomputes only its stage.
+        pipeline = Pipeline(st.session_state.setdefault('analysis_pipeline', {}))
+        pipeline.set_input(text_input)
+        pipeline.stage("document")(Document)
+        pipeline.stage("statistics", deps=("document",))(Document.stats)
+        pipeline.stage("cleaned_text", deps=("document",))(clean_text)
+        pipeline.stage("tokens", deps=("document",))(tokenize)
+        pipeline.stage("sentiment", deps=("document",))(cached_analyze)
+        pipeline.stage("extractive_summary", deps=("document",))(cached_summarize)
+        pipeline.stage("role_summary", deps=("document",))(
+            lambda document, role: get_role_based_summary(role, document)
+        )
+        pipeline.stage("word_frequencies", deps=("document",))(wcg.frequencies)
+
+        # Tokenize once; every stage below reads from this document
+        doc = pipeline.run("document")
         
         # Display original text info
         st.subheader("📊 Text Statistics")
+        stats = pipeline.run("statistics")
         col1, col2, col3, col4 = st.columns(4)
         with col1:
-            st.metric("Characters", len(text_input))
+            st.metric("Characters", stats['characters'])
         with col2:
-            st.metric("Words", len(text_input.split()))
+            st.metric("Words", stats['words'])
         with col3:
-            st.metric("Sentences", len(text_input.split('.')))
+            st.metric("Sentences", stats['sentences'])
         with col4:
-            st.metric("Paragraphs", len(text_input.split('\n\n')))
+            st.metric("Paragraphs", stats['paragraphs'])
 
         # Text cleaning section
         st.subheader("🧹 Text Preprocessing")
         with st.expander("View cleaned text and tokens"):
-            cleaned = clean_text(text_input)
-            tokens = tokenize(text_input)
+            cleaned = pipeline.run("cleaned_text")
+            tokens = pipeline.run("tokens")
             
             col1, col2 = st.columns(2)
             with col1:
@@ -178,7 +260,7 @@ if app_mode == "Text Analysis":
 
         # Sentiment Analysis
         st.subheader("😊 Sentiment Analysis")
-        sentiment_result = analyze(text_input)
+        sentiment_result = pipeline.run("sentiment")
         
         col1, col2 = st.columns([1, 2])
         with col1:
@@ -238,7 +320,7 @@ if app_mode == "Text Analysis":
         with col1:
             st.write("**🎯 Extractive Summary**")
             with st.spinner("Generating extractive summary..."):
-                extractive_summary = extractive_summarizer.summarize(text_input, max_length=extractive_length)
+                extractive_summary = pipeline.run("extractive_summary", max_length=extractive_length)
             if extractive_summary:
                 st.text_area("", value=extractive_summary, height=150, disabled=True)
             else:
@@ -250,19 +332,39 @@ if app_mode == "Text Analysis":
                 from text_analyzer import TRANSFORMERS_AVAILABLE
                 if TRANSFORMERS_AVAILABLE:
                     if st.button("Generate Abstractive Summary", help="Click to generate AI-powered abstractive summary"):
-                        with st.spinner("Loading AI model and generating summary..."):
+                        # Runs on a background worker; this script only polls for the result
+                        st.session_state['abstractive_job'] = abstractive_jobs.submit(
+                            text_input,
+                            max_length=abstractive_max_length,
+                            min_length=abstractive_min_length
+                        )
+
+                    job_id = st.session_state.get('abstractive_job')
+                    current_job_id = abstractive_jobs.job_id(text_input, abstractive_max_length, abstractive_min_length)
+                    if job_id and job_id == current_job_id:
+                        job_status = abstractive_jobs.poll(job_id)
+                        if job_status == "done":
+                            abstractive_result = abstractive_jobs.result(job_id)
+                            st.text_area("", value=abstractive_result['summary'], height=150, disabled=True)
+                            stage_times = ", ".join(f"{stage['stage']} {stage['seconds']:.1f}s" for stage in abstractive_result['stages'])
+                            st.caption(f"{abstractive_result['chunks']} chunk(s), batch size {abstractive_result['batch_size']} • {stage_times}")
+                        elif job_status in ("queued", "running"):
+                            st.info(f"⏳ Abstractive summary {job_status}... you can keep using the app meanwhile.")
+                            refresh_col, cancel_col = st.columns(2)
+                            with refresh_col:
+                                if st.button("🔄 Check Status"):
+                                    st.rerun()
+                            with cancel_col:
+                                if st.button("✖️ Cancel"):
+                                    abstractive_jobs.cancel(job_id)
+                                    st.rerun()
+                        elif job_status == "failed":
                             try:
-                                abstractive_summarizer = get_abstractive_summarizer()
-                                summary_result = abstractive_summarizer(
-                                    text_input, 
-                                    max_length=abstractive_max_length, 
-                                    min_length=abstractive_min_length, 
-                                    do_sample=False
-                                )
-                                abstractive_summary = summary_result[0]['summary_text']
-                                st.text_area("", value=abstractive_summary, height=150, disabled=True)
+                                abstractive_jobs.result(job_id)
                             except Exception as e:
                                 st.error(f"Error generating abstractive summary: {str(e)}")
+                        elif job_status == "cancelled":
+                            st.warning("Abstractive summary cancelled.")
                 else:
                     st.warning("🔧 Abstractive summarization requires the 'transformers' package to be installed. The feature is currently unavailable, but extractive summarization is working.")
             except ImportError:
@@ -271,7 +373,7 @@ if app_mode == "Text Analysis":
         # Role-based summary section
         st.subheader(f"🎯 {user_info['role'].title()} Perspective Summary")
         with st.spinner(f"Generating summary for {user_info['role']}..."):
-            role_summary = get_role_based_summary(user_info['role'], text_input)
+            role_summary = pipeline.run("role_summary", role=user_info['role'])
         
         st.info(role_summary)
         
@@ -301,45 +403,41 @@ if app_mode == "Text Analysis":
         )
         
         if st.button("Generate Word Cloud"):
-            with st.spinner("Generating word cloud..."):
-                cleaned_for_wc = clean_text(text_input)
-                if cleaned_for_wc:
-                    wc_image = wcg.generate_image(
-                        cleaned_for_wc,
-                        width=wc_width,
-                        height=wc_height,
-                        max_words=wc_max_words,
-                        colormap=wc_colormap
-                    )
-                    
-                    if wc_image:
-                        st.image(wc_image, caption="Generated Word Cloud")
-                        
-                        # Download button for word cloud
-                        buf = BytesIO()
-                        wc_image.save(buf, format="PNG")
-                        byte_im = buf.getvalue()
-                        
-                        st.download_button(
-                            label="📥 Download Word Cloud",
-                            data=byte_im,
-                            file_name="wordcloud.png",
-                            mime="image/png"
-                        )
-                    else:
-                        st.error("Unable to generate word cloud")
-                else:
-                    st.warning("No text available for word cloud generation after cleaning")
+            # Keep showing the cloud on later reruns; renders come from wcg's cache
+            st.session_state['show_wordcloud'] = True
+
+        if st.session_state.get('show_wordcloud'):
+            wc_frequencies = doc.cleaned_counts
+            if wc_frequencies:
+                if 'wordcloud_slot' not in st.session_state:
+                    st.session_state['wordcloud_slot'] = str(uuid.uuid4())
+                wc_options = dict(
+                    width=wc_width,
+                    height=wc_height,
+                    max_words=wc_max_words,
+                    colormap=wc_colormap,
+                    slot=st.session_state['wordcloud_slot']
+                )
+                # Returns at once: a cached full render, or a quick preview while the
+                # full-resolution layout runs off the script thread
+                wc_render = wcg.render_progressive(wc_frequencies, **wc_options)
+                # While the full render is running, only the word cloud reruns, on a timer
+                wc_polling = not wc_render['done'] and not wc_render.get('error')
+                st.fragment(show_wordcloud, run_every=WORDCLOUD_POLL_SECONDS if wc_polling else None)(
+                    wc_frequencies, wc_options, wc_polling
+                )
+            else:
+                st.warning("No text available for word cloud generation after cleaning")
 
         # Word Frequency Analysis
         st.subheader("📈 Word Frequency Analysis")
         with st.expander("View top words"):
-            cleaned_for_freq = clean_text(text_input)
+            cleaned_for_freq = pipeline.run("cleaned_text")
             if cleaned_for_freq:
-                frequencies = wcg.frequencies(cleaned_for_freq)
+                frequencies = pipeline.run("word_frequencies", top_k=20)
                 if frequencies:
                     # Display top 20 words
-                    freq_data = frequencies[:20]
+                    freq_data = frequencies
                     freq_df = pd.DataFrame(data=freq_data, columns=['Word', 'Frequency'])
                     
                     col1, col2 = st.columns([1, 1])
@@ -352,7 +450,14 @@ if app_mode == "Text Analysis":
             else:
                 st.warning("No text available for frequency analysis after cleaning")
 
-    else:
+        # Which stages this rerun actually computed
+        with st.expander("⚙️ Analysis pipeline"):
+            pipeline_df = pd.DataFrame(pipeline.report())
+            pipeline_df['status'] = pipeline_df['status'].map({'recomputed': '🔄 recomputed', 'cached': '✅ cached'})
+            pipeline_df['seconds'] = pipeline_df['seconds'].map(lambda seconds: f"{seconds:.3f}")
+            st.dataframe(pipeline_df, hide_index=True)
+
+    elif not large_upload:
         # Welcome message when no text is provided
         st.info("👆 Please enter some text above to begin analysis")
         
@@ -380,209 +485,283 @@ if app_mode == "Text Analysis":
 
 # ========== COMMUNITY POSTS MODE ==========
 elif app_mode == "Community Posts":
-    st.header("🌐 Community Posts")
+    # One pooled connection for every query on this page
+    with request_scope():
+        st.header("🌐 Community Posts")
     
-    # Tabs for different actions
-    tab1, tab2, tab3 = st.tabs(["📝 Create Post", "👀 View Posts", "💬 Review Posts"])
+        # Tabs for different actions
+        tab1, tab2, tab3 = st.tabs(["📝 Create Post", "👀 View Posts", "💬 Review Posts"])
     
-    with tab1:
-        st.subheader("Create a New Post")
-        st.info(f"📝 Posting as: **{user_info['username']}** ({user_info['role'].title()})")
-        with st.form("create_post_form"):
-            post_title = st.text_input("Title", placeholder="Enter a catchy title for your post")
-            post_content = st.text_area(
-                "Content", 
-                height=300,
-                placeholder="Write your post content here. This could be anything you want the community to review..."
-            )
+        with tab1:
+            st.subheader("Create a New Post")
+            st.info(f"📝 Posting as: **{user_info['username']}** ({user_info['role'].title()})")
+            with st.form("create_post_form"):
+                post_title = st.text_input("Title", placeholder="Enter a catchy title for your post")
+                post_content = st.text_area(
+                    "Content", 
+                    height=300,
+                    placeholder="Write your post content here. This could be anything you want the community to review..."
+                )
             
-            if st.form_submit_button("📤 Post"):
-                if post_title and post_content:
-                    post_id = create_post(post_title, post_content, user_info['username'])
-                    if post_id:
-                        st.success(f"✅ Post created successfully! Post ID: {post_id}")
-                        st.rerun()
+                if st.form_submit_button("📤 Post"):
+                    if post_title and post_content:
+                        post_id = create_post(post_title, post_content, user_info['username'])
+                        if post_id:
+                            st.success(f"✅ Post created successfully! Post ID: {post_id}")
+                            st.rerun()
+                        else:
+                            st.error("❌ Failed to create post. Please try again.")
                     else:
-                        st.error("❌ Failed to create post. Please try again.")
-                else:
-                    st.warning("⚠️ Please fill in all fields")
+                        st.warning("⚠️ Please fill in all fields")
     
-    with tab2:
-        st.subheader("All Community Posts")
-        posts = get_all_posts()
+        with tab2:
+            st.subheader("All Community Posts")
+            posts = paginate("posts_page", lambda cursor: list_posts(POSTS_PAGE_SIZE, cursor))
         
-        if posts:
-            for post in posts:
-                with st.expander(f"📄 {post['title']} by {post['author_name']} - {post['review_count']} reviews"):
-                    st.write("**Content:**")
-                    st.write(post['content'])
-                    st.write(f"**Posted:** {post['created_at'].strftime('%Y-%m-%d %H:%M')}")
+            if posts:
+                # Analytics for every listed post in a single query
+                analytics_by_post = get_posts_analytics([post['id'] for post in posts])
+                for post in posts:
+                    with st.expander(f"📄 {post['title']} by {post['author_name']} - {post['review_count']} reviews"):
+                        st.write("**Content:**")
+                        # Listings carry a snippet; the full text is fetched on demand
+                        if st.toggle("Show full post", key=f"full_{post['id']}"):
+                            full_post = get_post_by_id(post['id'])
+                            st.write(full_post['content'] if full_post else post['snippet'])
+                        else:
+                            st.write(post['snippet'])
+                        st.write(f"**Posted:** {post['created_at'].strftime('%Y-%m-%d %H:%M')}")
                     
-                    # Quick analytics
-                    if post['review_count'] > 0:
-                        analytics = get_post_analytics(post['id'])
-                        col1, col2, col3, col4 = st.columns(4)
-                        with col1:
-                            st.metric("Total Reviews", analytics['total_reviews'])
-                        with col2:
-                            st.metric("Positive", analytics['positive_count'])
-                        with col3:
-                            st.metric("Negative", analytics['negative_count'])
-                        with col4:
-                            st.metric("Neutral", analytics['neutral_count'])
-        else:
-            st.info("📭 No posts yet. Be the first to create one!")
+                        # Quick analytics
+                        if post['review_count'] > 0:
+                            analytics = analytics_by_post[post['id']]
+                            col1, col2, col3, col4 = st.columns(4)
+                            with col1:
+                                st.metric("Total Reviews", analytics['total_reviews'])
+                            with col2:
+                                st.metric("Positive", analytics['positive_count'])
+                            with col3:
+                                st.metric("Negative", analytics['negative_count'])
+                            with col4:
+                                st.metric("Neutral", analytics['neutral_count'])
+            else:
+                st.info("📭 No posts yet. Be the first to create one!")
     
-    with tab3:
-        st.subheader("Review Posts")
-        posts = get_all_posts()
+        with tab3:
+            st.subheader("Review Posts")
+            post_query = st.text_input("🔎 Search posts", placeholder="Search titles and content...")
+            if post_query.strip():
+                search_page = st.number_input("Results page", min_value=1, max_value=MAX_SEARCH_PAGE, value=1)
+                post_hits = search_posts(post_query, page=search_page, page_size=POSTS_PAGE_SIZE)
+                posts = post_hits['items']
+                if posts:
+                    with st.expander(f"🔎 {len(posts)} matching post(s) on page {post_hits['page']}"
+                                     f"{' - more on the next page' if post_hits['has_more'] else ''}", expanded=True):
+                        for hit in posts:
+                            st.markdown(f"**{hit['title']}** by {hit['author_name']}: {hit['headline']}")
+            else:
+                posts = paginate("review_posts_page", lambda cursor: list_posts(POSTS_PAGE_SIZE, cursor))
         
-        if posts:
-            post_options = {f"{post['title']} by {post['author_name']}": post['id'] for post in posts}
-            selected_post_title = st.selectbox("Select a post to review:", list(post_options.keys()))
+            if posts:
+                post_options = {f"{post['title']} by {post['author_name']}": post['id'] for post in posts}
+                selected_post_title = st.selectbox("Select a post to review:", list(post_options.keys()))
             
-            if selected_post_title:
-                selected_post_id = post_options[selected_post_title]
-                selected_post = get_post_by_id(selected_post_id)
+                if selected_post_title:
+                    selected_post_id = post_options[selected_post_title]
+                    selected_post = get_post_by_id(selected_post_id)
                 
-                if selected_post:
-                    # Display the post
-                    st.write("**Post Content:**")
-                    st.info(selected_post['content'])
+                    if selected_post:
+                        # Display the post
+                        st.write("**Post Content:**")
+                        st.info(selected_post['content'])
                     
-                    # Review form
-                    st.write("**Write Your Review:**")
-                    st.info(f"📝 Reviewing as: **{user_info['username']}** ({user_info['role'].title()})")
-                    with st.form("review_form"):
-                        review_text = st.text_area(
-                            "Review", 
-                            height=150,
-                            placeholder="Share your thoughts about this post..."
-                        )
+                        # Review form
+                        st.write("**Write Your Review:**")
+                        st.info(f"📝 Reviewing as: **{user_info['username']}** ({user_info['role'].title()})")
+                        with st.form("review_form"):
+                            review_text = st.text_area(
+                                "Review", 
+                                height=150,
+                                placeholder="Share your thoughts about this post..."
+                            )
                         
-                        if st.form_submit_button("📤 Submit Review"):
-                            if review_text:
-                                if create_review(selected_post_id, user_info['username'], review_text):
-                                    st.success("✅ Review submitted successfully!")
-                                    st.rerun()
+                            if st.form_submit_button("📤 Submit Review"):
+                                if review_text:
+                                    if create_review(selected_post_id, user_info['username'], review_text):
+                                        st.success("✅ Review submitted successfully!")
+                                        st.rerun()
+                                    else:
+                                        st.error("❌ Failed to submit review. Please try again.")
                                 else:
-                                    st.error("❌ Failed to submit review. Please try again.")
-                            else:
-                                st.warning("⚠️ Please fill in your review")
+                                    st.warning("⚠️ Please fill in your review")
                     
-                    # Show existing reviews
-                    st.write("**Existing Reviews:**")
-                    reviews = get_reviews_by_post(selected_post_id)
+                        # Show existing reviews
+                        st.write("**Existing Reviews:**")
+                        query_col, sentiment_col = st.columns([3, 1])
+                        with query_col:
+                            review_query = st.text_input("🔎 Search these reviews", key=f"review_search_{selected_post_id}")
+                        with sentiment_col:
+                            review_sentiment = st.selectbox(
+                                "Sentiment", ["all", "positive", "negative", "neutral"],
+                                key=f"review_sentiment_{selected_post_id}"
+                            )
+                        if review_query.strip():
+                            reviews = search_reviews(
+                                review_query, page_size=REVIEWS_PAGE_SIZE, post_id=selected_post_id,
+                                sentiment=None if review_sentiment == "all" else review_sentiment
+                            )['items']
+                        else:
+                            reviews = paginate(
+                                f"reviews_page_{selected_post_id}_{review_sentiment}",
+                                lambda cursor: list_reviews(
+                                    selected_post_id, REVIEWS_PAGE_SIZE, cursor,
+                                    None if review_sentiment == "all" else review_sentiment
+                                )
+                            )
                     
-                    if reviews:
-                        for review in reviews:
-                            sentiment_color = "🟢" if review['sentiment'] == 'positive' else "🔴" if review['sentiment'] == 'negative' else "🟡"
-                            with st.expander(f"{sentiment_color} Review by {review['reviewer_name']} - {review['sentiment'].upper()}"):
-                                st.write(review['review_text'])
-                                st.write(f"**Sentiment Score:** {review['sentiment_score']:.3f}")
-                                st.write(f"**Posted:** {review['created_at'].strftime('%Y-%m-%d %H:%M')}")
-                    else:
-                        st.info("📝 No reviews yet. Be the first to review this post!")
-        else:
-            st.info("📭 No posts available to review yet.")
+                        if reviews:
+                            for review in reviews:
+                                sentiment_color = "🟢" if review['sentiment'] == 'positive' else "🔴" if review['sentiment'] == 'negative' else "🟡"
+                                with st.expander(f"{sentiment_color} Review by {review['reviewer_name']} - {review['sentiment'].upper()}"):
+                                    # Search hits carry a highlighted fragment instead of the full text
+                                    if 'headline' in review:
+                                        st.markdown(review['headline'])
+                                    else:
+                                        st.write(review['review_text'])
+                                    st.write(f"**Sentiment Score:** {review['sentiment_score']:.3f}")
+                                    st.write(f"**Posted:** {review['created_at'].strftime('%Y-%m-%d %H:%M')}")
+                        elif review_query.strip() or review_sentiment != "all":
+                            st.info("🔎 No reviews match.")
+                        else:
+                            st.info("📝 No reviews yet. Be the first to review this post!")
+            elif post_query.strip():
+                st.info("🔎 No posts match your search.")
+            else:
+                st.info("📭 No posts available to review yet.")
 
-# ========== MY ANALYTICS MODE ==========
+    # ========== MY ANALYTICS MODE ==========
 elif app_mode == "My Analytics":
-    st.header("📊 My Analytics Dashboard")
-    st.info(f"📊 Showing analytics for: **{user_info['username']}** ({user_info['role'].title()})")
+    # One pooled connection for every query on this page
+    with request_scope():
+        st.header("📊 My Analytics Dashboard")
+        st.info(f"📊 Showing analytics for: **{user_info['username']}** ({user_info['role'].title()})")
     
-    user_posts = get_posts_by_author(user_info['username'])
+        dashboard = get_author_dashboard(user_info['username'])
+        user_posts = dashboard['posts']
     
-    if user_posts:
-        st.subheader(f"📝 Your Posts ({len(user_posts)} total)")
+        if user_posts:
+            st.subheader(f"📝 Your Posts ({len(user_posts)} total)")
         
-        # Overall statistics
-        total_reviews = sum(post['review_count'] for post in user_posts)
-        st.metric("Total Reviews Received", total_reviews)
+            # Overall statistics
+            st.metric("Total Reviews Received", dashboard['totals']['total_reviews'])
+
+            # Sentiment over time, read from the hourly/daily rollups
+            st.subheader("📈 Sentiment Over Time")
+            trend_period = st.radio("Period", ["Last 30 days", "Last 48 hours"], horizontal=True, key="trend_period")
+            trend_granularity = "day" if trend_period == "Last 30 days" else "hour"
+            author_trend = get_author_sentiment_trend(user_info['username'], granularity=trend_granularity)
+            # Every post's series in one query; expander bodies run even when collapsed
+            post_trends = get_posts_sentiment_trends([post['id'] for post in user_posts], granularity=trend_granularity)
+            if any(point['review_count'] for point in author_trend):
+                trend_df = pd.DataFrame(author_trend).set_index('bucket_start')
+                st.line_chart(trend_df[['positive_count', 'negative_count', 'neutral_count']])
+                st.line_chart(trend_df[['average_score']])
+            else:
+                st.info("No reviews in this period.")
         
-        # Individual post analytics
-        for post in user_posts:
-            with st.expander(f"📄 {post['title']} - {post['review_count']} reviews"):
-                    st.write("**Content Preview:**")
-                    preview = post['content'][:200] + "..." if len(post['content']) > 200 else post['content']
-                    st.write(preview)
+            # Individual post analytics
+            for post in user_posts:
+                with st.expander(f"📄 {post['title']} - {post['review_count']} reviews"):
+                        st.write("**Content Preview:**")
+                        st.write(post['snippet'])
                     
-                    if post['review_count'] > 0:
-                        # Get detailed analytics
-                        analytics = get_post_analytics(post['id'])
+                        if post['review_count'] > 0:
+                            # Detailed analytics, already loaded with the dashboard
+                            analytics = post['analytics']
                         
-                        # Display metrics
-                        col1, col2, col3, col4, col5 = st.columns(5)
-                        with col1:
-                            st.metric("Total Reviews", analytics['total_reviews'])
-                        with col2:
-                            st.metric("Positive", analytics['positive_count'], 
-                                    f"{(analytics['positive_count']/analytics['total_reviews']*100):.1f}%")
-                        with col3:
-                            st.metric("Negative", analytics['negative_count'], 
-                                    f"{(analytics['negative_count']/analytics['total_reviews']*100):.1f}%")
-                        with col4:
-                            st.metric("Neutral", analytics['neutral_count'], 
-                                    f"{(analytics['neutral_count']/analytics['total_reviews']*100):.1f}%")
-                        with col5:
-                            st.metric("Avg Score", f"{analytics['average_sentiment_score']:.3f}")
+                            # Display metrics
+                            col1, col2, col3, col4, col5 = st.columns(5)
+                            with col1:
+                                st.metric("Total Reviews", analytics['total_reviews'])
+                            with col2:
+                                st.metric("Positive", analytics['positive_count'], 
+                                        f"{(analytics['positive_count']/analytics['total_reviews']*100):.1f}%")
+                            with col3:
+                                st.metric("Negative", analytics['negative_count'], 
+                                        f"{(analytics['negative_count']/analytics['total_reviews']*100):.1f}%")
+                            with col4:
+                                st.metric("Neutral", analytics['neutral_count'], 
+                                        f"{(analytics['neutral_count']/analytics['total_reviews']*100):.1f}%")
+                            with col5:
+                                st.metric("Avg Score", f"{analytics['average_sentiment_score']:.3f}")
                         
-                        # Sentiment breakdown chart
-                        sentiment_data = pd.DataFrame({
-                            'Sentiment': ['Positive', 'Negative', 'Neutral'],
-                            'Count': [analytics['positive_count'], analytics['negative_count'], analytics['neutral_count']]
-                        })
-                        st.bar_chart(sentiment_data.set_index('Sentiment'))
+                            # Sentiment breakdown chart
+                            sentiment_data = pd.DataFrame({
+                                'Sentiment': ['Positive', 'Negative', 'Neutral'],
+                                'Count': [analytics['positive_count'], analytics['negative_count'], analytics['neutral_count']]
+                            })
+                            st.bar_chart(sentiment_data.set_index('Sentiment'))
+
+                            post_trend = post_trends.get(post['id'], [])
+                            if any(point['review_count'] for point in post_trend):
+                                st.write("**Reviews Over Time:**")
+                                post_trend_df = pd.DataFrame(post_trend).set_index('bucket_start')
+                                st.line_chart(post_trend_df[['positive_count', 'negative_count', 'neutral_count']])
+                        
+                            # View reviews by sentiment
+                            col1, col2, col3 = st.columns(3)
                         
-                        # View reviews by sentiment
-                        col1, col2, col3 = st.columns(3)
+                            with col1:
+                                if st.button(f"View Positive ({analytics['positive_count']})", key=f"pos_{post['id']}"):
+                                    positive_reviews = get_reviews_by_post(post['id'], 'positive')
+                                    if positive_reviews:
+                                        st.write("**Positive Reviews:**")
+                                        for review in positive_reviews:
+                                            with st.container():
+                                                st.success(f"**{review['reviewer_name']}**: {review['review_text']}")
+                                                st.write(f"Score: {review['sentiment_score']:.3f}")
                         
-                        with col1:
-                            if st.button(f"View Positive ({analytics['positive_count']})", key=f"pos_{post['id']}"):
-                                positive_reviews = get_reviews_by_post(post['id'], 'positive')
-                                if positive_reviews:
-                                    st.write("**Positive Reviews:**")
-                                    for review in positive_reviews:
-                                        with st.container():
-                                            st.success(f"**{review['reviewer_name']}**: {review['review_text']}")
-                                            st.write(f"Score: {review['sentiment_score']:.3f}")
+                            with col2:
+                                if st.button(f"View Negative ({analytics['negative_count']})", key=f"neg_{post['id']}"):
+                                    negative_reviews = get_reviews_by_post(post['id'], 'negative')
+                                    if negative_reviews:
+                                        st.write("**Negative Reviews:**")
+                                        for review in negative_reviews:
+                                            with st.container():
+                                                st.error(f"**{review['reviewer_name']}**: {review['review_text']}")
+                                                st.write(f"Score: {review['sentiment_score']:.3f}")
                         
-                        with col2:
-                            if st.button(f"View Negative ({analytics['negative_count']})", key=f"neg_{post['id']}"):
-                                negative_reviews = get_reviews_by_post(post['id'], 'negative')
-                                if negative_reviews:
-                                    st.write("**Negative Reviews:**")
-                                    for review in negative_reviews:
-                                        with st.container():
-                                            st.error(f"**{review['reviewer_name']}**: {review['review_text']}")
-                                            st.write(f"Score: {review['sentiment_score']:.3f}")
+                            with col3:
+                                if st.button(f"View Neutral ({analytics['neutral_count']})", key=f"neu_{post['id']}"):
+                                    neutral_reviews = get_reviews_by_post(post['id'], 'neutral')
+                                    if neutral_reviews:
+                                        st.write("**Neutral Reviews:**")
+                                        for review in neutral_reviews:
+                                            with st.container():
+                                                st.info(f"**{review['reviewer_name']}**: {review['review_text']}")
+                                                st.write(f"Score: {review['sentiment_score']:.3f}")
                         
-                        with col3:
-                            if st.button(f"View Neutral ({analytics['neutral_count']})", key=f"neu_{post['id']}"):
-                                neutral_reviews = get_reviews_by_post(post['id'], 'neutral')
-                                if neutral_reviews:
-                                    st.write("**Neutral Reviews:**")
-                                    for review in neutral_reviews:
-                                        with st.container():
-                                            st.info(f"**{review['reviewer_name']}**: {review['review_text']}")
-                                            st.write(f"Score: {review['sentiment_score']:.3f}")
+                            # Most common words across every review of this post
+                            if st.button("🔤 Top Review Words", key=f"words_{post['id']}"):
+                                top_review_words = get_top_review_words(post['id'], k=20)
+                                if top_review_words:
+                                    words_df = pd.DataFrame(data=top_review_words, columns=['Word', 'Frequency'])
+                                    st.bar_chart(words_df.set_index('Word'))
                         
-                        # Overall summary using text analysis
-                        if st.button("📋 Generate Overall Summary", key=f"summary_{post['id']}"):
-                            all_reviews = get_reviews_by_post(post['id'])
-                            review_texts = [review['review_text'] for review in all_reviews]
-                            combined_text = " ".join(review_texts)
+                            # Overall summary using text analysis
+                            if st.button("📋 Generate Overall Summary", key=f"summary_{post['id']}"):
+                                # Maintained as reviews arrive, so this is one row read
+                                digest = get_review_digest(post['id'])
                             
-                            if combined_text:
-                                st.write("**Overall Review Summary:**")
-                                summary = extractive_summarizer.summarize(combined_text, max_length=100)
-                                st.info(summary)
-                    else:
-                        st.info("No reviews yet for this post.")
-        # else:
-        #     st.info(f"No posts found for User. Create some posts first!")
-    else:
-        st.info(f"No posts found for user {user_info['username']}. Create some posts first!")
+                                if digest and digest['summary']:
+                                    st.write("**Overall Review Summary:**")
+                                    st.info(digest['summary'])
+                        else:
+                            st.info("No reviews yet for this post.")
+            # else:
+            #     st.info(f"No posts found for User. Create some posts first!")
+        else:
+            st.info(f"No posts found for user {user_info['username']}. Create some posts first!")
 
 # Footer
 st.markdown("---")
@@ -0,0 +1,304 @@
+"""Async counterpart of database.py's post, review, digest, analytics and trend API
+on SQLAlchemy's asyncio extension. Users and authentication, bulk imports,
+rebuilds and the text-analysis readers (top words, role summaries) stay sync-only.
+
+Every function here runs the same statement builders and row mappers as its
+synchronous twin in database.py, and returns the same shapes. Independent
+queries for one page can run at once with ``gather``, each on its own pooled
+connection:
+
+    post, analytics, reviews = await gather(
+        get_post_by_id(post_id), get_post_analytics(post_id), list_reviews(post_id),
+    )
+
+Sync callers (Streamlit) use ``run_sync``, which executes a coroutine on one
+long-lived background event loop; async drivers bind pooled connections to the
+loop that opened them, so the loop must outlive every call.
+
+Needs an async driver: asyncpg for PostgreSQL, aiosqlite for SQLite.
+"""
+import asyncio
+import os
+import threading
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Awaitable, Dict, List, Optional
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from database import (
+    DATABASE_URL, DB_MAX_OVERFLOW, DB_POOL_PRE_PING, DB_POOL_RECYCLE, DB_POOL_SIZE,
+    DB_POOL_TIMEOUT, DB_STATEMENT_TIMEOUT_MS, DEFAULT_PAGE_SIZE, DIGEST_SUMMARY_LENGTH,
+    _all_posts_query, _analytics_from_stats, _apply_invalidation, _author_dashboard_query, _author_post_from_row,
+    _create_review_steps, _dashboard_from_rows, _digest_from_row, _empty_analytics, _insert_post_query,
+    _invalidation_payload, _list_posts_query, _list_reviews_query, _listing_post_from_row, _notify_steps, _page,
+    _page_size, _post_analytics_query, _post_by_id_query, _post_from_row, _post_trends_from_rows,
+    _post_with_count_from_row, _posts_analytics_query, _posts_by_author_query, _review_digest_query,
+    _review_from_row, _reviews_by_post_query, _trend_query, _trend_range, _trends_from_rows,
+)
+from text_analyzer import analyze
+
+_ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+}
+
+def async_database_url(url: str = DATABASE_URL) -> str:
+    """DATABASE_URL with its sync driver swapped for the matching async one"""
+    scheme, sep, rest = url.partition("://")
+    return _ASYNC_DRIVERS.get(scheme, scheme) + sep + rest
+
+ASYNC_DATABASE_URL = os.environ.get("ASYNC_DATABASE_URL") or async_database_url()
+
+def _async_engine_options(url: str) -> Dict:
+    # Same pool settings as the sync engine
+    options = {"pool_pre_ping": DB_POOL_PRE_PING, "pool_recycle": DB_POOL_RECYCLE}
+    if not url.startswith("sqlite"):
+        options.update(pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW, pool_timeout=DB_POOL_TIMEOUT)
+    if url.startswith("postgresql+asyncpg") and DB_STATEMENT_TIMEOUT_MS > 0:
+        options["connect_args"] = {"server_settings": {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)}}
+    return options
+
+_async_engine = None
+_engine_lock = threading.Lock()
+
+def get_async_engine():
+    """The shared AsyncEngine, created on first use so importing needs no async driver"""
+    global _async_engine
+    with _engine_lock:
+        if _async_engine is None:
+            _async_engine = create_async_engine(ASYNC_DATABASE_URL, **_async_engine_options(ASYNC_DATABASE_URL))
+        return _async_engine
+
+@asynccontextmanager
+async def get_async_connection():
+    async with get_async_engine().connect() as conn:
+        yield conn
+
+async def gather(*aws: Awaitable) -> List:
+    """Run independent queries concurrently; results come back in argument order"""
+    return list(await asyncio.gather(*aws))
+
+# ---------- Background loop for sync callers ----------
+_loop = None
+_loop_lock = threading.Lock()
+
+def _background_loop() -> asyncio.AbstractEventLoop:
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="async-db-loop", daemon=True).start()
+        return _loop
+
+def run_sync(coro, timeout: Optional[float] = None):
+    """Run a coroutine from this module on the background loop and wait for its result"""
+    return asyncio.run_coroutine_threadsafe(coro, _background_loop()).result(timeout)
+
+# ---------- Writes ----------
+async def _run_steps(conn, steps) -> None:
+    """Async driver for database.py's write-step generators"""
+    result = None
+    while True:
+        try:
+            query = steps.send(result)
+        except StopIteration:
+            return
+        result = await conn.execute(*query)
+
+async def _commit_and_invalidate(conn, post_ids) -> None:
+    # Keep the sync API's query cache coherent with writes made here
+    payload = _invalidation_payload(post_ids)
+    await _run_steps(conn, _notify_steps(payload, conn.dialect.name))
+    await conn.commit()
+    _apply_invalidation(payload)
+
+# ---------- Posts ----------
+async def create_post(title: str, content: str, author_name: str) -> Optional[int]:
+    """Create a new post and return the post ID"""
+    try:
+        async with get_async_connection() as conn:
+            row = (await conn.execute(*_insert_post_query(title, content, author_name))).fetchone()
+            await _commit_and_invalidate(conn, [])
+            return row[0] if row else None
+    except SQLAlchemyError as e:
+        print(f"Error creating post: {e}")
+        return None
+
+async def get_all_posts() -> List[Dict]:
+    """Get all posts with their basic info"""
+    try:
+        async with get_async_connection() as conn:
+            return [_post_with_count_from_row(row) for row in await conn.execute(*_all_posts_query())]
+    except SQLAlchemyError as e:
+        print(f"Error getting posts: {e}")
+        return []
+
+async def get_posts_by_author(author_name: str) -> List[Dict]:
+    """Get all posts by a specific author"""
+    try:
+        async with get_async_connection() as conn:
+            return [_author_post_from_row(row) for row in await conn.execute(*_posts_by_author_query(author_name))]
+    except SQLAlchemyError as e:
+        print(f"Error getting posts by author: {e}")
+        return []
+
+async def get_post_by_id(post_id: int) -> Optional[Dict]:
+    """Get a specific post by ID"""
+    try:
+        async with get_async_connection() as conn:
+            row = (await conn.execute(*_post_by_id_query(post_id))).fetchone()
+            return _post_from_row(row) if row else None
+    except SQLAlchemyError as e:
+        print(f"Error getting post: {e}")
+        return None
+
+async def list_posts(page_size: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None,
+                     author_name: Optional[str] = None) -> Dict:
+    """One page of posts, newest first; see database.list_posts"""
+    page_size = _page_size(page_size)
+    try:
+        async with get_async_connection() as conn:
+            result = await conn.execute(*_list_posts_query(page_size, cursor, author_name))
+            return _page([_listing_post_from_row(row) for row in result], page_size)
+    except SQLAlchemyError as e:
+        print(f"Error listing posts: {e}")
+        return {'items': [], 'next_cursor': None}
+
+# ---------- Reviews ----------
+async def get_reviews_by_post(post_id: int, sentiment_filter: Optional[str] = None) -> List[Dict]:
+    """Get all reviews for a specific post, optionally filtered by sentiment"""
+    try:
+        async with get_async_connection() as conn:
+            result = await conn.execute(*_reviews_by_post_query(post_id, sentiment_filter))
+            return [_review_from_row(row) for row in result]
+    except SQLAlchemyError as e:
+        print(f"Error getting reviews: {e}")
+        return []
+
+async def list_reviews(post_id: int, page_size: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None,
+                       sentiment_filter: Optional[str] = None) -> Dict:
+    """One page of a post's reviews, newest first; see database.list_reviews"""
+    page_size = _page_size(page_size)
+    try:
+        async with get_async_connection() as conn:
+            result = await conn.execute(*_list_reviews_query(post_id, page_size, cursor, sentiment_filter))
+            return _page([_review_from_row(row) for row in result], page_size)
+    except SQLAlchemyError as e:
+        print(f"Error listing reviews: {e}")
+        return {'items': [], 'next_cursor': None}
+
+async def create_review(post_id: int, reviewer_name: str, review_text: str) -> bool:
+    """Create a review for a post with sentiment analysis"""
+    try:
+        # VADER is CPU-bound; keep it off the event loop
+        sentiment_result = await asyncio.to_thread(analyze, review_text)
+        async with get_async_connection() as conn:
+            # Same statements, in the same order, as database.create_review
+            await _run_steps(conn, _create_review_steps(post_id, reviewer_name, review_text, sentiment_result,
+                                                        conn.dialect.name))
+            await _commit_and_invalidate(conn, [post_id])
+            return True
+    except SQLAlchemyError as e:
+        print(f"Error creating review: {e}")
+        return False
+
+async def get_review_digest(post_id: int, max_length: int = DIGEST_SUMMARY_LENGTH) -> Optional[Dict]:
+    """A post's stored review summary; None if it has no reviews yet"""
+    try:
+        async with get_async_connection() as conn:
+            row = (await conn.execute(*_review_digest_query(post_id))).fetchone()
+    except SQLAlchemyError as e:
+        print(f"Error getting review digest: {e}")
+        return None
+    if max_length == DIGEST_SUMMARY_LENGTH:
+        return _digest_from_row(row, max_length)
+    # Re-ranking the stored candidates is CPU-bound; keep it off the event loop
+    return await asyncio.to_thread(_digest_from_row, row, max_length)
+
+# ---------- Analytics ----------
+async def get_post_analytics(post_id: int) -> Dict:
+    """Get analytics for a specific post"""
+    try:
+        async with get_async_connection() as conn:
+            row = (await conn.execute(*_post_analytics_query(post_id))).fetchone()
+            return _analytics_from_stats(row) if row else _empty_analytics()
+    except SQLAlchemyError as e:
+        print(f"Error getting analytics: {e}")
+        return _empty_analytics()
+
+async def get_posts_analytics(post_ids: List[int]) -> Dict[int, Dict]:
+    """Analytics for many posts in one query, keyed by post id"""
+    post_ids = list(post_ids)
+    analytics = {post_id: _empty_analytics() for post_id in post_ids}
+    if not post_ids:
+        return analytics
+    try:
+        async with get_async_connection() as conn:
+            for row in await conn.execute(*_posts_analytics_query(post_ids)):
+                analytics[row[0]] = _analytics_from_stats(row[1:])
+    except SQLAlchemyError as e:
+        print(f"Error getting analytics: {e}")
+    return analytics
+
+async def get_author_dashboard(author_name: str) -> Dict:
+    """An author's posts plus per-post analytics and overall totals, in one query"""
+    try:
+        async with get_async_connection() as conn:
+            return _dashboard_from_rows(await conn.execute(*_author_dashboard_query(author_name)))
+    except SQLAlchemyError as e:
+        print(f"Error getting author dashboard: {e}")
+        return {'posts': [], 'totals': _empty_analytics()}
+
+async def get_post_sentiment_trend(post_id: int, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                                   granularity: str = "day") -> List[Dict]:
+    """Sentiment per hour or day for one post; see database.get_post_sentiment_trend"""
+    start, end = _trend_range(granularity, start, end)
+    try:
+        async with get_async_connection() as conn:
+            rows = await conn.execute(*_trend_query("post", [post_id], granularity, start, end))
+            return _trends_from_rows(rows, [post_id], granularity, start, end)[str(post_id)]
+    except SQLAlchemyError as e:
+        print(f"Error getting post sentiment trend: {e}")
+        return []
+
+async def get_posts_sentiment_trends(post_ids: List[int], start: Optional[datetime] = None,
+                                     end: Optional[datetime] = None, granularity: str = "day") -> Dict[int, List[Dict]]:
+    """Sentiment series for many posts in one query, keyed by post id"""
+    post_ids = list(post_ids)
+    start, end = _trend_range(granularity, start, end)
+    if not post_ids:
+        return {}
+    try:
+        async with get_async_connection() as conn:
+            rows = await conn.execute(*_trend_query("post", post_ids, granularity, start, end))
+            return _post_trends_from_rows(rows, post_ids, granularity, start, end)
+    except SQLAlchemyError as e:
+        print(f"Error getting post sentiment trends: {e}")
+        return _post_trends_from_rows([], post_ids, granularity, start, end)
+
+async def get_author_sentiment_trend(author_name: str, start: Optional[datetime] = None,
+                                     end: Optional[datetime] = None, granularity: str = "day") -> List[Dict]:
+    """Sentiment per hour or day across an author's posts; see database.get_author_sentiment_trend"""
+    start, end = _trend_range(granularity, start, end)
+    try:
+        async with get_async_connection() as conn:
+            rows = await conn.execute(*_trend_query("author", [author_name], granularity, start, end))
+            return _trends_from_rows(rows, [author_name], granularity, start, end)[author_name]
+    except SQLAlchemyError as e:
+        print(f"Error getting author sentiment trend: {e}")
+        return []
+
+# ---------- Page loaders ----------
+async def get_post_detail(post_id: int, reviews_cursor: Optional[str] = None,
+                          reviews_page_size: int = DEFAULT_PAGE_SIZE) -> Dict:
+    """Everything the review page shows for one post, fetched concurrently"""
+    post, analytics, reviews = await gather(
+        get_post_by_id(post_id),
+        get_post_analytics(post_id),
+        list_reviews(post_id, reviews_page_size, reviews_cursor),
+    )
+    return {'post': post, 'analytics': analytics, 'reviews': reviews}
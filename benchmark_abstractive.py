@@ -0,0 +1,202 @@
+"""Compare abstractive summarization backends on a fixed local corpus.
+
+Each backend runs in its own subprocess so load time and resident memory
+are measured from a clean interpreter. Output drift is reported as ROUGE-1
+and ROUGE-L F1 of every backend's summaries against the fp32 summaries.
+
+    python benchmark_abstractive.py                      # all backends
+    python benchmark_abstractive.py --backends fp32 int8
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+from text_analyzer import ABSTRACTIVE_BACKENDS
+
+BENCHMARK_CORPUS = [
+    (
+        "The city council approved a new budget on Tuesday that increases funding for public transport "
+        "by twelve percent. Council members said the money will be used to add more buses on busy routes "
+        "and to extend service hours on weekends. Several residents spoke at the meeting, asking for better "
+        "lighting at bus stops and more frequent service in the outer neighbourhoods. The mayor said the plan "
+        "is a first step and promised a review of ticket prices later in the year. Opposition members argued "
+        "that the budget does too little for road maintenance, which they said has been neglected for years."
+    ),
+    (
+        "A regional hospital has opened a new outpatient wing designed to cut waiting times for routine "
+        "procedures. The wing has eight treatment rooms and a dedicated pharmacy, and staff expect it to handle "
+        "around three hundred patients a week. Hospital managers said that moving minor procedures out of the "
+        "main building frees up beds for emergency cases. Nurses welcomed the extra space but warned that the "
+        "hospital still needs to recruit more staff to run the wing at full capacity. The health department "
+        "said it would monitor waiting times over the next six months before deciding on similar projects."
+    ),
+    (
+        "Farmers in the northern districts are reporting a strong wheat harvest after a season of steady "
+        "rainfall. Agricultural officers estimate that yields are up by nearly a fifth compared with last year. "
+        "Prices at local markets have fallen slightly as supply has increased, which has helped consumers but "
+        "squeezed the margins of small growers. Farmer groups are asking the government to raise the minimum "
+        "support price and to build more storage facilities so that grain does not spoil while waiting for "
+        "buyers. Officials said new warehouses are planned but will not be ready before the next harvest."
+    ),
+    (
+        "A technology startup that builds software for small shops has raised new funding from a group of "
+        "investors. The company says its app lets shop owners track stock, accept digital payments and send "
+        "reminders to customers with unpaid bills. It plans to use the money to hire engineers and to expand "
+        "into three more states. The founders said that most of their users had never used accounting software "
+        "before, so the app was designed to work in local languages and on low-cost phones. Analysts said the "
+        "market is crowded and that the company will need to keep its costs low to compete."
+    ),
+    (
+        "Students at several universities have started a campaign asking for more affordable campus housing. "
+        "They say rents near campus have risen sharply over the past three years and that many students now "
+        "commute for hours every day. University administrators said they are aware of the problem and are "
+        "talking to private developers about building new hostels. Some professors have backed the students, "
+        "arguing that long commutes are hurting attendance and grades. The campaign plans a series of meetings "
+        "with local officials next month to discuss rent controls and public land for student housing."
+    ),
+]
+
+
+# ---------- ROUGE ----------
+def _tokens(text):
+    return [t for t in "".join(c.lower() if c.isalnum() else " " for c in text).split() if t]
+
+def _f1(overlap, n_candidate, n_reference):
+    if overlap == 0 or n_candidate == 0 or n_reference == 0:
+        return 0.0
+    precision = overlap / n_candidate
+    recall = overlap / n_reference
+    return 2 * precision * recall / (precision + recall)
+
+def rouge_1(candidate, reference):
+    cand, ref = _tokens(candidate), _tokens(reference)
+    ref_counts = {}
+    for t in ref:
+        ref_counts[t] = ref_counts.get(t, 0) + 1
+    overlap = 0
+    for t in cand:
+        if ref_counts.get(t, 0) > 0:
+            ref_counts[t] -= 1
+            overlap += 1
+    return _f1(overlap, len(cand), len(ref))
+
+def rouge_l(candidate, reference):
+    cand, ref = _tokens(candidate), _tokens(reference)
+    # Longest common subsequence, one row at a time
+    previous = [0] * (len(ref) + 1)
+    for c in cand:
+        current = [0]
+        for j, r in enumerate(ref):
+            current.append(previous[j] + 1 if c == r else max(previous[j + 1], current[j]))
+        previous = current
+    return _f1(previous[-1], len(cand), len(ref))
+
+
+# ---------- Measurement ----------
+def _rss_mb():
+    """Current resident set size; falls back to the peak where /proc is unavailable."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError):
+        return _peak_rss_mb()
+
+def _peak_rss_mb():
+    import resource
+    # ru_maxrss is kilobytes on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def run_backend(backend, runs, max_length, min_length):
+    """Benchmark one backend in this process and return its measurements."""
+    from text_analyzer import get_abstractive_summarizer, summarize_abstractive
+
+    rss_before = _rss_mb()
+    started = time.perf_counter()
+    summarizer = get_abstractive_summarizer(backend)
+    load_seconds = time.perf_counter() - started
+    rss_loaded = _rss_mb()
+
+    # Warm-up so the first timed call does not include lazy initialisation
+    summarize_abstractive(BENCHMARK_CORPUS[0], max_length=max_length, min_length=min_length, summarizer=summarizer)
+
+    latencies = []
+    summaries = []
+    for _ in range(runs):
+        summaries = []
+        for text in BENCHMARK_CORPUS:
+            started = time.perf_counter()
+            result = summarize_abstractive(text, max_length=max_length, min_length=min_length, summarizer=summarizer)
+            latencies.append(time.perf_counter() - started)
+            summaries.append(result["summary"])
+
+    latencies.sort()
+    return {
+        "backend": backend,
+        "load_seconds": load_seconds,
+        "model_rss_mb": rss_loaded - rss_before,
+        "peak_rss_mb": _peak_rss_mb(),
+        "mean_latency_seconds": sum(latencies) / len(latencies),
+        "p50_latency_seconds": latencies[len(latencies) // 2],
+        "summaries": summaries,
+    }
+
+def _run_in_subprocess(backend, args):
+    cmd = [
+        sys.executable, __file__, "--worker", backend,
+        "--runs", str(args.runs), "--max-length", str(args.max_length), "--min-length", str(args.min_length),
+    ]
+    completed = subprocess.run(cmd, capture_output=True, text=True)
+    if completed.returncode != 0:
+        return {"backend": backend, "error": completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else "failed"}
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark abstractive summarization backends")
+    parser.add_argument("--backends", nargs="+", default=list(ABSTRACTIVE_BACKENDS), choices=ABSTRACTIVE_BACKENDS)
+    parser.add_argument("--runs", type=int, default=1, help="Passes over the corpus per backend")
+    parser.add_argument("--max-length", type=int, default=60)
+    parser.add_argument("--min-length", type=int, default=20)
+    parser.add_argument("--json", action="store_true", help="Print raw results as JSON")
+    parser.add_argument("--worker", choices=ABSTRACTIVE_BACKENDS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_backend(args.worker, args.runs, args.max_length, args.min_length)))
+        return
+
+    backends = list(args.backends)
+    if "fp32" not in backends:
+        # fp32 output is the reference for drift
+        backends.insert(0, "fp32")
+    results = [_run_in_subprocess(backend, args) for backend in backends]
+
+    reference = next((r for r in results if r["backend"] == "fp32" and "error" not in r), None)
+    for result in results:
+        if "error" in result or reference is None:
+            continue
+        pairs = list(zip(result["summaries"], reference["summaries"]))
+        result["rouge1_vs_fp32"] = sum(rouge_1(c, r) for c, r in pairs) / len(pairs)
+        result["rougeL_vs_fp32"] = sum(rouge_l(c, r) for c, r in pairs) / len(pairs)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'backend':<8} {'load s':>8} {'model MB':>9} {'peak MB':>8} {'mean s':>7} {'p50 s':>7} {'R-1':>6} {'R-L':>6}")
+    for r in results:
+        if "error" in r:
+            print(f"{r['backend']:<8} error: {r['error']}")
+            continue
+        print(
+            f"{r['backend']:<8} {r['load_seconds']:>8.1f} {r['model_rss_mb']:>9.0f} {r['peak_rss_mb']:>8.0f} "
+            f"{r['mean_latency_seconds']:>7.2f} {r['p50_latency_seconds']:>7.2f} "
+            f"{r.get('rouge1_vs_fp32', 0.0):>6.3f} {r.get('rougeL_vs_fp32', 0.0):>6.3f}"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""Streaming CSV/JSONL import and export for posts and reviews.
+
+Records are read and written one at a time and inserted in batches through
+``create_posts_bulk`` / ``create_reviews_bulk``, so memory stays flat for any
+file size. After every committed batch the number of input records done is
+written to a checkpoint file; an interrupted import resumes from there.
+
+    python manage.py import reviews reviews.csv --rescore
+    python manage.py import reviews reviews.csv --resume
+    python manage.py export posts posts.jsonl
+"""
+import csv
+import json
+import os
+import sys
+from datetime import datetime
+from itertools import islice
+from typing import Dict, Iterator, Optional
+
+from sqlalchemy import text
+
+from database import BULK_BATCH_SIZE, create_posts_bulk, create_reviews_bulk, get_connection
+
+FORMATS = ("csv", "jsonl")
+TABLES = ("posts", "reviews")
+EXPORT_COLUMNS = {
+    "posts": ("id", "title", "content", "author_name", "created_at"),
+    "reviews": ("id", "post_id", "reviewer_name", "review_text", "sentiment", "sentiment_score", "created_at"),
+}
+EXPORT_FETCH_SIZE = 1000
+
+# Post bodies can exceed the csv module's default 128 KB field limit
+csv.field_size_limit(min(sys.maxsize, 2 ** 31 - 1))
+
+
+def detect_format(path: str, fmt: Optional[str] = None) -> str:
+    if fmt:
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown format {fmt!r}; expected one of {FORMATS}")
+        return fmt
+    suffix = os.path.splitext(path)[1].lower()
+    if suffix == ".csv":
+        return "csv"
+    if suffix in (".jsonl", ".ndjson"):
+        return "jsonl"
+    raise ValueError(f"Cannot tell the format of {path!r}; pass --format")
+
+
+def read_records(path: str, fmt: Optional[str] = None) -> Iterator:
+    """Yield one dict per CSV row or JSONL line; a malformed JSON line yields its error message instead"""
+    fmt = detect_format(path, fmt)
+    with open(path, newline="", encoding="utf-8") as f:
+        if fmt == "csv":
+            yield from csv.DictReader(f)
+            return
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                yield f"invalid JSON: {e}"
+
+
+# ---------- Field coercion ----------
+# CSV gives strings for everything; convert what the columns need. A record that
+# cannot be converted is replaced by its error message, which the bulk functions
+# report as a failed row at the same index.
+def _coerce(table: str, record):
+    if not isinstance(record, dict):
+        return record
+    record = {key: (None if value == "" else value) for key, value in record.items()}
+    try:
+        if record.get("created_at") is not None and not isinstance(record["created_at"], datetime):
+            record["created_at"] = datetime.fromisoformat(str(record["created_at"]))
+        if table == "reviews":
+            if record.get("post_id") is not None:
+                record["post_id"] = int(record["post_id"])
+            if record.get("sentiment_score") is not None:
+                record["sentiment_score"] = float(record["sentiment_score"])
+    except (TypeError, ValueError) as e:
+        return f"invalid value: {e}"
+    return record
+
+
+# ---------- Checkpoints ----------
+def checkpoint_path(path: str, table: str) -> str:
+    return f"{path}.{table}.checkpoint"
+
+
+class CheckpointMismatch(ValueError):
+    """The checkpoint was written for a different file, table, or an earlier version of the file"""
+
+
+def _source_fingerprint(source: str, table: str) -> Dict:
+    stat = os.stat(source)
+    return {"source": os.path.abspath(source), "table": table, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def load_checkpoint(path: str, source: str, table: str) -> int:
+    """Records already committed from ``source``; 0 without a checkpoint.
+
+    Raises CheckpointMismatch if ``source`` was edited or replaced since the
+    checkpoint was written, since the count would then skip the wrong records.
+    """
+    try:
+        with open(path) as f:
+            saved = json.load(f)
+        records_done = int(saved["records_done"])
+    except (OSError, ValueError, KeyError, TypeError):
+        return 0
+    current = _source_fingerprint(source, table)
+    changed = [key for key, value in current.items() if saved.get(key) != value]
+    if changed:
+        raise CheckpointMismatch(
+            f"{path} does not match {source} ({', '.join(changed)} changed); "
+            f"delete the checkpoint to import from the start"
+        )
+    return records_done
+
+
+def save_checkpoint(path: str, source: str, table: str, records_done: int) -> None:
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(dict(_source_fingerprint(source, table), records_done=records_done), f)
+    # Atomic, so a crash never leaves a truncated checkpoint behind
+    os.replace(tmp, path)
+
+
+# ---------- Import / export ----------
+def import_file(table: str, path: str, fmt: Optional[str] = None, batch_size: int = BULK_BATCH_SIZE,
+                rescore: bool = False, resume: bool = False, workers: Optional[int] = None,
+                preserve_ids: bool = False, checkpoint: Optional[str] = None, on_batch=None) -> Dict:
+    """Stream records from ``path`` into ``table`` in committed batches.
+
+    Reviews keep the sentiment columns found in the file unless ``rescore`` is
+    set (rows without them are always scored). With ``resume`` the records
+    already committed by a previous run, per the checkpoint, are skipped; if
+    the file changed since then, CheckpointMismatch is raised instead.
+    Failure indexes in the returned report are record numbers in the file.
+    """
+    if table not in TABLES:
+        raise ValueError(f"Unknown table {table!r}; expected one of {TABLES}")
+    checkpoint = checkpoint or checkpoint_path(path, table)
+    offset = load_checkpoint(checkpoint, path, table) if resume else 0
+    records = (_coerce(table, record) for record in islice(read_records(path, fmt), offset, None))
+
+    def batch_done(report):
+        save_checkpoint(checkpoint, path, table, offset + report['last_index'] + 1)
+        if on_batch:
+            on_batch(report, offset)
+
+    if table == "posts":
+        report = create_posts_bulk(records, batch_size=batch_size, preserve_ids=preserve_ids, on_batch=batch_done)
+    else:
+        report = create_reviews_bulk(records, batch_size=batch_size, workers=workers, score=rescore,
+                                     on_batch=batch_done)
+
+    for failure in report['failures']:
+        failure['index'] += offset
+    report['resumed_from'] = offset
+    if os.path.exists(checkpoint):
+        # Finished: the next run of the same file starts from the top
+        os.remove(checkpoint)
+    return report
+
+
+def _json_value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def export_table(table: str, path: str, fmt: Optional[str] = None) -> int:
+    """Stream every row of ``table`` to ``path``; returns the number of rows written"""
+    if table not in TABLES:
+        raise ValueError(f"Unknown table {table!r}; expected one of {TABLES}")
+    fmt = detect_format(path, fmt)
+    columns = EXPORT_COLUMNS[table]
+    written = 0
+    with get_connection() as conn, open(path, "w", newline="", encoding="utf-8") as f:
+        result = conn.execute(
+            text(f"SELECT {', '.join(columns)} FROM {table} ORDER BY id")
+            .execution_options(stream_results=True, yield_per=EXPORT_FETCH_SIZE)
+        )
+        writer = None
+        if fmt == "csv":
+            writer = csv.writer(f)
+            writer.writerow(columns)
+        for row in result:
+            values = [_json_value(value) for value in row]
+            if writer:
+                writer.writerow(values)
+            else:
+                f.write(json.dumps(dict(zip(columns, values)), ensure_ascii=False) + "\n")
+            written += 1
+    return written
@@ -1,6 +1,9 @@
 from database import engine
 from models import Base
+from migrations import upgrade
 
 print("Creating tables...")
 Base.metadata.create_all(engine)
+# Full-text search columns and indexes that the models cannot declare portably
+upgrade(concurrently=False)
 print("Tables created successfully!")
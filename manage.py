@@ -0,0 +1,128 @@
+"""Maintenance commands for the sentiment database.
+
+    python manage.py migrate           # add missing tables and indexes
+    python manage.py explain           # check the hot queries use their indexes
+    python manage.py rebuild-stats     # backfill post_sentiment_stats from reviews
+    python manage.py rebuild-digests   # backfill post_review_digests from reviews
+    python manage.py rebuild-rollups   # backfill hourly/daily sentiment_rollups from reviews
+    python manage.py import reviews reviews.csv [--rescore] [--resume]
+    python manage.py export posts posts.jsonl
+"""
+import argparse
+import sys
+
+from data_io import FORMATS, TABLES, CheckpointMismatch, export_table, import_file
+from database import (
+    BULK_BATCH_SIZE, rebuild_post_sentiment_stats, rebuild_review_digests, rebuild_sentiment_rollups,
+)
+from migrations import explain_hot_queries, upgrade
+
+
+def cmd_rebuild_stats(args):
+    print("Rebuilding post sentiment stats...")
+    posts = rebuild_post_sentiment_stats()
+    print(f"Rebuilt stats for {posts} posts.")
+
+
+def cmd_rebuild_digests(args):
+    print("Rebuilding post review digests...")
+    posts = rebuild_review_digests()
+    print(f"Rebuilt digests for {posts} posts.")
+
+
+def cmd_rebuild_rollups(args):
+    print("Rebuilding sentiment rollups...")
+    buckets = rebuild_sentiment_rollups()
+    print(f"Rebuilt {buckets} time buckets.")
+
+
+def cmd_migrate(args):
+    for statement in upgrade(concurrently=not args.no_concurrently):
+        print(statement)
+    print("Schema is up to date.")
+
+
+def cmd_explain(args):
+    report = explain_hot_queries(force_index=not args.natural)
+    for entry in report:
+        status = "OK  " if entry["uses_index"] else "MISS"
+        print(f"{status} {entry['query']:<32} {entry['index']}")
+        if args.verbose or not entry["uses_index"]:
+            print(entry["plan"])
+    if not all(entry["uses_index"] for entry in report):
+        sys.exit(1)
+
+
+def cmd_import(args):
+    def progress(report, offset):
+        print(f"  {offset + report['last_index'] + 1} records done, {report['inserted']} inserted, "
+              f"{report['failed']} failed, {report['rows_per_second']:.0f} rows/s")
+
+    try:
+        report = import_file(
+            args.table, args.path, fmt=args.format, batch_size=args.batch_size, rescore=args.rescore,
+            resume=args.resume, workers=args.workers, preserve_ids=args.preserve_ids, on_batch=progress,
+        )
+    except CheckpointMismatch as e:
+        print(f"Cannot resume: {e}", file=sys.stderr)
+        sys.exit(1)
+    if report['resumed_from']:
+        print(f"Resumed after {report['resumed_from']} records.")
+    print(f"Imported {report['inserted']} {args.table} ({report['failed']} failed) in {report['seconds']:.1f}s, "
+          f"{report['rows_per_second']:.0f} rows/s via {report['method']}.")
+    for failure in report['failures']:
+        print(f"  record {failure['index']}: {failure['error']}")
+
+
+def cmd_export(args):
+    rows = export_table(args.table, args.path, fmt=args.format)
+    print(f"Exported {rows} {args.table} to {args.path}.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sentiment database maintenance")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    migrate = subparsers.add_parser("migrate", help="Create missing tables and indexes on an existing database")
+    migrate.add_argument("--no-concurrently", action="store_true",
+                         help="Build PostgreSQL indexes with a blocking CREATE INDEX")
+    migrate.set_defaults(func=cmd_migrate)
+
+    explain = subparsers.add_parser("explain", help="Check that the hot queries are planned on their indexes")
+    explain.add_argument("--natural", action="store_true",
+                         help="Leave sequential scans enabled (PostgreSQL) to see the planner's actual choice")
+    explain.add_argument("--verbose", action="store_true", help="Print every query plan")
+    explain.set_defaults(func=cmd_explain)
+
+    rebuild_stats = subparsers.add_parser("rebuild-stats", help="Recompute per-post sentiment aggregates")
+    rebuild_stats.set_defaults(func=cmd_rebuild_stats)
+
+    rebuild_digests = subparsers.add_parser("rebuild-digests", help="Recompute per-post review summaries")
+    rebuild_digests.set_defaults(func=cmd_rebuild_digests)
+
+    rebuild_rollups = subparsers.add_parser("rebuild-rollups", help="Recompute hourly/daily sentiment trends")
+    rebuild_rollups.set_defaults(func=cmd_rebuild_rollups)
+
+    import_cmd = subparsers.add_parser("import", help="Stream posts or reviews from a CSV/JSONL file")
+    import_cmd.add_argument("table", choices=TABLES)
+    import_cmd.add_argument("path")
+    import_cmd.add_argument("--format", choices=FORMATS, help="Default: from the file extension")
+    import_cmd.add_argument("--batch-size", type=int, default=BULK_BATCH_SIZE)
+    import_cmd.add_argument("--rescore", action="store_true", help="Re-score review sentiment instead of keeping the file's")
+    import_cmd.add_argument("--resume", action="store_true", help="Continue from the last checkpoint for this file")
+    import_cmd.add_argument("--workers", type=int, help="Sentiment scoring processes (default: CPU count)")
+    import_cmd.add_argument("--preserve-ids", action="store_true", help="Keep post ids from the file")
+    import_cmd.set_defaults(func=cmd_import)
+
+    export_cmd = subparsers.add_parser("export", help="Stream posts or reviews to a CSV/JSONL file")
+    export_cmd.add_argument("table", choices=TABLES)
+    export_cmd.add_argument("path")
+    export_cmd.add_argument("--format", choices=FORMATS, help="Default: from the file extension")
+    export_cmd.set_defaults(func=cmd_export)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
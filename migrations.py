@@ -0,0 +1,238 @@
+"""Schema upgrades for existing databases.
+
+``init_db.py`` builds a fresh schema with ``create_all``; ``upgrade`` brings an
+existing database up to the models without blocking writes: missing tables are
+created, rows left with a NULL ``created_at`` by older versions are stamped, and
+missing indexes are built with ``CREATE INDEX CONCURRENTLY`` on PostgreSQL. On
+PostgreSQL it also adds the full-text ``search_vector`` columns used by
+search.py, filled by a trigger and a batched backfill rather than a table
+rewrite. ``explain_hot_queries`` checks that the hot listing queries are
+planned on those indexes.
+"""
+from datetime import datetime
+from typing import Dict, List
+
+from sqlalchemy import DateTime, bindparam, text
+
+from database import DEFAULT_PAGE_SIZE, _list_posts_query, _list_reviews_query, encode_cursor, engine
+from models import Base
+
+# The hot access paths, built by the same functions database.py executes, so the
+# check covers the real statements. A far-future cursor stands in for page 2+.
+_SAMPLE_CURSOR = encode_cursor(datetime(2100, 1, 1), 0)
+
+HOT_QUERIES = [
+    (
+        "posts feed page",
+        "ix_posts_created_at_id",
+        lambda: _list_posts_query(DEFAULT_PAGE_SIZE, _SAMPLE_CURSOR, None),
+    ),
+    (
+        "posts by author",
+        "ix_posts_author_name_created_at",
+        lambda: _list_posts_query(DEFAULT_PAGE_SIZE, None, "author"),
+    ),
+    (
+        "reviews of a post",
+        "ix_reviews_post_id_created_at",
+        lambda: _list_reviews_query(0, DEFAULT_PAGE_SIZE, _SAMPLE_CURSOR, None),
+    ),
+    (
+        "reviews of a post by sentiment",
+        "ix_reviews_post_id_sentiment_created_at",
+        lambda: _list_reviews_query(0, DEFAULT_PAGE_SIZE, None, "positive"),
+    ),
+]
+
+# PostgreSQL full-text search: a tsvector column per table, kept current by a
+# trigger and searched through a GIN index. Title terms rank above body terms.
+# "{row}" is "NEW." inside the trigger and empty in the backfill.
+SEARCH_VECTORS = {
+    "posts": (
+        "setweight(to_tsvector('english', coalesce({row}title, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce({row}content, '')), 'B')"
+    ),
+    "reviews": "to_tsvector('english', coalesce({row}review_text, ''))",
+}
+SEARCH_SOURCE_COLUMNS = {"posts": ("title", "content"), "reviews": ("review_text",)}
+SEARCH_COLUMN = "search_vector"
+
+# Tables paginated on (created_at, id); older rows may have a NULL created_at
+TIMESTAMPED_TABLES = ("posts", "reviews")
+
+# Rows per backfill UPDATE; each batch commits on its own
+BACKFILL_BATCH = 5000
+
+
+def _model_indexes():
+    for table in Base.metadata.sorted_tables:
+        for index in sorted(table.indexes, key=lambda ix: ix.name):
+            yield table, index
+
+
+def _drop_invalid_index(conn, name: str) -> None:
+    # A failed CONCURRENTLY build leaves an INVALID index that IF NOT EXISTS would skip
+    invalid = conn.execute(
+        text("""
+            SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+            WHERE c.relname = :name AND NOT i.indisvalid
+        """),
+        {"name": name}
+    ).fetchone()
+    if invalid:
+        conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+
+
+def _backfill_created_at(conn) -> List[str]:
+    """Stamp rows written before created_at was always set, so keyset pagination can reach them.
+
+    Expects an AUTOCOMMIT connection: the default change and each id-range
+    batch commit on their own, so no lock is held for the whole table.
+    """
+    applied = []
+    now = datetime.utcnow()
+    for table_name in TIMESTAMPED_TABLES:
+        if conn.dialect.name == "postgresql":
+            # Catalog-only change: later raw INSERTs get a UTC timestamp too
+            statement = f"ALTER TABLE {table_name} ALTER COLUMN created_at SET DEFAULT TIMEZONE('utc', CURRENT_TIMESTAMP)"
+            conn.execute(text(statement))
+            applied.append(statement)
+        low, high = conn.execute(text(f"SELECT MIN(id), MAX(id) FROM {table_name} WHERE created_at IS NULL")).one()
+        backfill = text(f"""
+            UPDATE {table_name} SET created_at = :now
+            WHERE id >= :low AND id < :high AND created_at IS NULL
+        """).bindparams(bindparam("now", type_=DateTime))
+        stamped = 0
+        while low is not None and low <= high:
+            stamped += conn.execute(backfill, {"now": now, "low": low, "high": low + BACKFILL_BATCH}).rowcount
+            low += BACKFILL_BATCH
+        applied.append(f"UPDATE {table_name} SET created_at = :now WHERE created_at IS NULL -- {stamped} rows backfilled")
+    return applied
+
+
+def _search_column_generated(conn, table_name: str) -> bool:
+    # Databases migrated by an earlier version have a GENERATED ... STORED column instead
+    return conn.execute(text("""
+        SELECT is_generated = 'ALWAYS' FROM information_schema.columns
+        WHERE table_name = :table_name AND column_name = :column
+    """), {"table_name": table_name, "column": SEARCH_COLUMN}).scalar() is True
+
+
+def _add_search_column(conn, table_name: str, concurrently: bool) -> List[str]:
+    """Add and fill ``table_name``'s search column without a table rewrite.
+
+    Adding a nullable column without a default only touches the catalog; a
+    trigger keeps new and edited rows current while existing rows are filled
+    in short batches, and the GIN index comes last, so its presence means the
+    column is complete.
+    """
+    applied = []
+    statements = [f"ALTER TABLE {table_name} ADD COLUMN IF NOT EXISTS {SEARCH_COLUMN} tsvector"]
+    if not _search_column_generated(conn, table_name):
+        function_name = f"{table_name}_{SEARCH_COLUMN}_update"
+        statements += [
+            f"CREATE OR REPLACE FUNCTION {function_name}() RETURNS trigger AS $$ "
+            f"BEGIN NEW.{SEARCH_COLUMN} := {SEARCH_VECTORS[table_name].format(row='NEW.')}; RETURN NEW; END "
+            f"$$ LANGUAGE plpgsql",
+            f"DROP TRIGGER IF EXISTS {function_name} ON {table_name}",
+            f"CREATE TRIGGER {function_name} BEFORE INSERT OR UPDATE OF "
+            f"{', '.join(SEARCH_SOURCE_COLUMNS[table_name])} ON {table_name} "
+            f"FOR EACH ROW EXECUTE FUNCTION {function_name}()",
+        ]
+    for statement in statements:
+        conn.execute(text(statement))
+        applied.append(statement)
+
+    # Each batch commits on its own (AUTOCOMMIT), so row locks are held only briefly
+    backfill = text(f"""
+        UPDATE {table_name} SET {SEARCH_COLUMN} = {SEARCH_VECTORS[table_name].format(row='')}
+        WHERE id IN (SELECT id FROM {table_name} WHERE {SEARCH_COLUMN} IS NULL ORDER BY id LIMIT :batch)
+    """)
+    filled = 0
+    while True:
+        rowcount = conn.execute(backfill, {"batch": BACKFILL_BATCH}).rowcount
+        if not rowcount:
+            break
+        filled += rowcount
+    applied.append(f"UPDATE {table_name} SET {SEARCH_COLUMN} = ... -- {filled} rows backfilled")
+
+    index_name = f"ix_{table_name}_{SEARCH_COLUMN}"
+    statement = (
+        f"CREATE INDEX {'CONCURRENTLY ' if concurrently else ''}IF NOT EXISTS "
+        f"{index_name} ON {table_name} USING GIN ({SEARCH_COLUMN})"
+    )
+    if concurrently:
+        _drop_invalid_index(conn, index_name)
+    conn.execute(text(statement))
+    applied.append(statement)
+    return applied
+
+
+def upgrade(concurrently: bool = True) -> List[str]:
+    """Create missing tables and indexes; returns the statements that were run"""
+    applied = []
+    Base.metadata.create_all(engine, checkfirst=True)
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        applied.extend(_backfill_created_at(conn))
+
+    if engine.dialect.name != "postgresql":
+        with engine.begin() as conn:
+            for table, index in _model_indexes():
+                index.create(conn, checkfirst=True)
+                applied.append(f"CREATE INDEX IF NOT EXISTS {index.name}")
+        return applied
+
+    # CONCURRENTLY cannot run inside a transaction block
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for table, index in _model_indexes():
+            columns = ", ".join(column.name for column in index.columns)
+            statement = (
+                f"CREATE INDEX {'CONCURRENTLY ' if concurrently else ''}IF NOT EXISTS "
+                f"{index.name} ON {table.name} ({columns})"
+            )
+            if concurrently:
+                _drop_invalid_index(conn, index.name)
+            conn.execute(text(statement))
+            applied.append(statement)
+
+        for table_name in SEARCH_VECTORS:
+            applied.extend(_add_search_column(conn, table_name, concurrently))
+    return applied
+
+
+def _explainable_sql(conn, query) -> str:
+    """A (statement, params) pair from database.py rendered with its parameters inline"""
+    statement, params = query
+    compiled = statement.bindparams(**params).compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True})
+    return str(compiled)
+
+
+def _plan_uses_index(conn, sql: str, index_name: str):
+    if conn.dialect.name == "postgresql":
+        plan = conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}").scalar()
+        plan_text = str(plan)
+        return f"'Index Name': '{index_name}'" in plan_text, plan_text
+    if conn.dialect.name == "sqlite":
+        rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}").fetchall()
+        plan_text = "\n".join(str(row[-1]) for row in rows)
+        return f"INDEX {index_name}" in plan_text, plan_text
+    plan_text = "\n".join(str(row[0]) for row in conn.exec_driver_sql(f"EXPLAIN {sql}"))
+    return index_name in plan_text, plan_text
+
+
+def explain_hot_queries(force_index: bool = True) -> List[Dict]:
+    """EXPLAIN each hot query and report whether it is planned on its index.
+
+    On a small database PostgreSQL rightly prefers a sequential scan, so by
+    default sequential scans are disabled for the check; the result then says
+    whether the index is usable for the query, not whether it is worth it yet.
+    """
+    report = []
+    with engine.connect() as conn:
+        if force_index and conn.dialect.name == "postgresql":
+            conn.execute(text("SET LOCAL enable_seqscan = off"))
+        for name, index_name, build in HOT_QUERIES:
+            uses_index, plan = _plan_uses_index(conn, _explainable_sql(conn, build()), index_name)
+            report.append({"query": name, "index": index_name, "uses_index": uses_index, "plan": plan})
+        conn.rollback()
+    return report
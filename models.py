@@ -1,11 +1,28 @@
 # models.py
 
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Float
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Float, Index
 from sqlalchemy.orm import declarative_base, relationship
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
 from datetime import datetime
 
 Base = declarative_base()
 
+
+class utcnow(FunctionElement):
+    """Current UTC time as a server-side default, matching the datetime.utcnow() the app writes"""
+    type = DateTime()
+    inherit_cache = True
+
+@compiles(utcnow)
+def _utcnow_default(element, compiler, **kw):
+    # SQLite's CURRENT_TIMESTAMP is already UTC
+    return "CURRENT_TIMESTAMP"
+
+@compiles(utcnow, "postgresql")
+def _utcnow_postgresql(element, compiler, **kw):
+    return "TIMEZONE('utc', CURRENT_TIMESTAMP)"
+
 # ================= USER MODEL =================
 class User(Base):
     __tablename__ = "users"
@@ -29,12 +46,19 @@ class User(Base):
 # ================= POST MODEL =================
 class Post(Base):
     __tablename__ = "posts"
+    __table_args__ = (
+        # Keyset pagination of the post feed: ORDER BY created_at DESC, id DESC
+        Index("ix_posts_created_at_id", "created_at", "id"),
+        # An author's posts, newest first
+        Index("ix_posts_author_name_created_at", "author_name", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     title = Column(String(255), nullable=False)
     content = Column(Text, nullable=False)
     author_name = Column(String(100), nullable=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    # server_default covers raw INSERTs that leave created_at out; keyset pagination needs it set
+    created_at = Column(DateTime, default=datetime.utcnow, server_default=utcnow())
 
     # Foreign key linking to user
     author_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"))
@@ -50,6 +74,12 @@ class Post(Base):
 # ================= REVIEW MODEL =================
 class Review(Base):
     __tablename__ = "reviews"
+    __table_args__ = (
+        # A post's reviews, newest first (also serves plain post_id lookups)
+        Index("ix_reviews_post_id_created_at", "post_id", "created_at", "id"),
+        # A post's reviews of one sentiment, newest first
+        Index("ix_reviews_post_id_sentiment_created_at", "post_id", "sentiment", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     post_id = Column(Integer, ForeignKey("posts.id", ondelete="CASCADE"), nullable=False)
@@ -58,7 +88,7 @@ class Review(Base):
     review_text = Column(Text, nullable=False)
     sentiment = Column(String(20), nullable=False)   # positive, negative, neutral
     sentiment_score = Column(Float, nullable=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, server_default=utcnow())
 
     # Relationships
     post = relationship("Post", back_populates="reviews")
@@ -66,3 +96,57 @@ class Review(Base):
 
     def __repr__(self):
         return f"<Review(post_id={self.post_id}, sentiment='{self.sentiment}')>"
+
+
+# ================= POST SENTIMENT STATS MODEL =================
+# Running per-post review aggregates, maintained by create_review so that
+# post analytics are a single primary-key lookup.
+class PostSentimentStats(Base):
+    __tablename__ = "post_sentiment_stats"
+
+    post_id = Column(Integer, ForeignKey("posts.id", ondelete="CASCADE"), primary_key=True)
+    positive_count = Column(Integer, nullable=False, default=0, server_default="0")
+    negative_count = Column(Integer, nullable=False, default=0, server_default="0")
+    neutral_count = Column(Integer, nullable=False, default=0, server_default="0")
+    review_count = Column(Integer, nullable=False, default=0, server_default="0")
+    score_sum = Column(Float, nullable=False, default=0.0, server_default="0")
+
+    def __repr__(self):
+        return f"<PostSentimentStats(post_id={self.post_id}, reviews={self.review_count})>"
+
+
+# ================= POST REVIEW DIGEST =================
+class PostReviewDigest(Base):
+    """Running extractive summary of a post's reviews, extended as reviews arrive"""
+    __tablename__ = "post_review_digests"
+
+    post_id = Column(Integer, ForeignKey("posts.id", ondelete="CASCADE"), primary_key=True)
+    state = Column(Text, nullable=False)
+    summary = Column(Text, nullable=False, default="", server_default="")
+    review_count = Column(Integer, nullable=False, default=0, server_default="0")
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<PostReviewDigest(post_id={self.post_id}, reviews={self.review_count})>"
+
+
+# ================= SENTIMENT ROLLUPS =================
+class SentimentRollup(Base):
+    """Review sentiment per time bucket for one post or one author, kept current on insert"""
+    __tablename__ = "sentiment_rollups"
+
+    # Key order serves the trend query: one scope and key, a range of bucket_start
+    granularity = Column(String(10), primary_key=True)  # 'hour' or 'day'
+    scope = Column(String(10), primary_key=True)  # 'post' or 'author'
+    scope_key = Column(String(150), primary_key=True)  # post id or author name
+    bucket_start = Column(DateTime, primary_key=True)
+    positive_count = Column(Integer, nullable=False, default=0, server_default="0")
+    negative_count = Column(Integer, nullable=False, default=0, server_default="0")
+    neutral_count = Column(Integer, nullable=False, default=0, server_default="0")
+    review_count = Column(Integer, nullable=False, default=0, server_default="0")
+    score_sum = Column(Float, nullable=False, default=0.0, server_default="0")
+    score_sq_sum = Column(Float, nullable=False, default=0.0, server_default="0")
+
+    def __repr__(self):
+        return (f"<SentimentRollup({self.granularity} {self.scope}={self.scope_key} "
+                f"{self.bucket_start}, reviews={self.review_count})>")
@@ -0,0 +1,99 @@
+"""Dependency-tracked memoization for multi-stage computations.
+
+Streamlit re-executes the whole script on every widget interaction. A
+``Pipeline`` keeps the last result of each stage in a caller-supplied store
+(``st.session_state`` in the app) under a key derived from the stage name, its
+parameters and the keys of the stages it depends on. A stage therefore re-runs
+only when its own parameters or something upstream of it changed:
+
+    pipeline = Pipeline(st.session_state.setdefault("analysis_pipeline", {}))
+    pipeline.set_input(text)
+
+    @pipeline.stage("document")
+    def document(text):
+        return Document(text)
+
+    @pipeline.stage("summary", deps=("document",))
+    def summary(doc, max_length):
+        return summarize(doc, max_length=max_length)
+
+    pipeline.run("summary", max_length=120)
+    pipeline.report()   # per stage: recomputed or cached, and how long it took
+"""
+import hashlib
+import json
+import time
+from typing import Any, Callable, Dict, MutableMapping, Optional, Sequence, Tuple
+
+INPUT = "input"
+
+
+class Pipeline:
+    """Named stages with explicit dependencies, memoized one result per stage."""
+
+    def __init__(self, store: Optional[MutableMapping] = None):
+        # One (key, value) slot per stage, so the store never grows with reruns
+        self.store = {} if store is None else store
+        self._stages: Dict[str, Tuple[Callable, Tuple[str, ...]]] = {}
+        self._input_key: Optional[str] = None
+        self._input = None
+        self.last_run: Dict[str, Dict] = {}
+
+    def set_input(self, value: str) -> str:
+        """Set the pipeline's root input; stages see it through the ``"input"`` dependency"""
+        self._input = value
+        self._input_key = hashlib.sha256(value.encode("utf-8")).hexdigest()
+        return self._input_key
+
+    def stage(self, name: str, deps: Sequence[str] = (INPUT,)):
+        """Register ``func(*dep_results, **params)`` as stage ``name``"""
+        if name == INPUT:
+            raise ValueError(f"{INPUT!r} is reserved for the pipeline input")
+
+        def decorator(func):
+            for dep in deps:
+                if dep != INPUT and dep not in self._stages:
+                    raise ValueError(f"Stage {name!r} depends on unknown stage {dep!r}")
+            self._stages[name] = (func, tuple(deps))
+            return func
+        return decorator
+
+    def _stage_key(self, name: str, dep_keys: Sequence[str], params: Dict[str, Any]) -> str:
+        payload = json.dumps([name, list(dep_keys), sorted(params.items())], default=repr)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _resolve(self, name: str, params: Dict[str, Any]) -> Tuple[str, Any]:
+        if name == INPUT:
+            if self._input_key is None:
+                raise RuntimeError("Pipeline input is not set; call set_input() first")
+            return self._input_key, self._input
+
+        func, deps = self._stages[name]
+        # Dependencies run with their defaults; only the requested stage gets params
+        resolved = [self._resolve(dep, {}) for dep in deps]
+        key = self._stage_key(name, [dep_key for dep_key, _ in resolved], params)
+
+        slot = self.store.get(f"pipeline:{name}")
+        if slot is not None and slot[0] == key:
+            self.last_run.setdefault(name, {"status": "cached", "seconds": 0.0, "deps": deps})
+            return key, slot[1]
+
+        started = time.perf_counter()
+        value = func(*(dep_value for _, dep_value in resolved), **params)
+        self.store[f"pipeline:{name}"] = (key, value)
+        self.last_run[name] = {"status": "recomputed", "seconds": time.perf_counter() - started, "deps": deps}
+        return key, value
+
+    def run(self, name: str, **params) -> Any:
+        """Return stage ``name``'s result, recomputing it and its dependencies only if their inputs changed"""
+        if name not in self._stages:
+            raise KeyError(f"Unknown stage {name!r}")
+        return self._resolve(name, params)[1]
+
+    def report(self):
+        """Stages touched since this Pipeline object was created, in first-use order"""
+        return [
+            {"stage": name, "status": info["status"], "seconds": info["seconds"],
+             "depends_on": ", ".join(info["deps"])}
+            for name, info in self.last_run.items()
+        ]
@@ -0,0 +1,364 @@
+"""Ranked full-text search over posts and reviews.
+
+On PostgreSQL, searches run against the trigger-maintained ``search_vector``
+tsvector columns and their GIN indexes (created by ``python manage.py migrate``),
+ranked with ts_rank_cd, with highlighted fragments from ts_headline. Elsewhere (SQLite,
+or PostgreSQL before the migration) an in-process inverted index with BM25
+ranking is used instead. It is built from the tables on first use and catches up
+on newly inserted rows before every search, so writes from any process show up.
+
+Both backends treat the query as AND of its terms, apply English stemming, and
+return the same result shape:
+
+    {'items': [...], 'page': 1, 'has_more': bool, 'backend': 'postgres' | 'memory'}
+"""
+import heapq
+import math
+import threading
+import time
+from collections import defaultdict
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from nltk.stem import PorterStemmer
+import sqlalchemy as sa
+from sqlalchemy import bindparam, text
+from sqlalchemy.exc import SQLAlchemyError
+
+from database import DEFAULT_PAGE_SIZE, _page_size, engine, get_connection
+from migrations import SEARCH_COLUMN
+from text_analyzer import _WORD_RE, _stopwords
+
+MAX_SEARCH_PAGE = 50          # ranked results are paged by offset; deep pages are not useful
+HEADLINE_WORDS = 25
+INDEX_FETCH_SIZE = 1000
+HIGHLIGHT = "**"              # Markdown bold, as rendered by Streamlit
+
+_PG_HEADLINE_OPTIONS = f"StartSel={HIGHLIGHT}, StopSel={HIGHLIGHT}, MaxWords={HEADLINE_WORDS}, MinWords=10, MaxFragments=2"
+
+
+# ---------- Analysis ----------
+_stemmer = PorterStemmer()
+
+@lru_cache(maxsize=100000)
+def _stem(word: str) -> str:
+    return _stemmer.stem(word)
+
+def analyze_terms(text_value: str) -> List[str]:
+    """Lowercased, stop-word-free, stemmed terms; the in-memory analogue of to_tsvector('english')"""
+    stop_words = _stopwords()
+    return [_stem(w) for w in _WORD_RE.findall(text_value.lower()) if w not in stop_words and len(w) > 1]
+
+
+# ---------- In-process inverted index ----------
+class InvertedIndex:
+    """Term → {doc_id: weighted term frequency} postings, ranked with BM25."""
+
+    k1 = 1.2
+    b = 0.75
+
+    def __init__(self):
+        self.postings: Dict[str, Dict[int, float]] = defaultdict(dict)
+        self.lengths: Dict[int, float] = {}
+        self.meta: Dict[int, Dict] = {}
+        self._total_length = 0.0
+
+    def __len__(self):
+        return len(self.lengths)
+
+    def add(self, doc_id: int, fields: Iterable[Tuple[str, float]], **meta) -> None:
+        """Index ``fields`` as (text, weight) pairs; ``meta`` is kept for filtering"""
+        tf = defaultdict(float)
+        for value, weight in fields:
+            for term in analyze_terms(value or ""):
+                tf[term] += weight
+        for term, freq in tf.items():
+            self.postings[term][doc_id] = freq
+        length = sum(tf.values())
+        self.lengths[doc_id] = length
+        self._total_length += length
+        self.meta[doc_id] = meta
+
+    def search(self, terms: List[str], limit: int, **filters) -> List[Tuple[float, int]]:
+        """Top ``limit`` (score, doc_id) pairs for documents containing every term"""
+        if not terms or not self.lengths:
+            return []
+        postings = [self.postings.get(term) for term in terms]
+        if not all(postings):
+            return []
+        postings.sort(key=len)
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates &= posting.keys()
+        if filters:
+            candidates = {
+                doc_id for doc_id in candidates
+                if all(self.meta[doc_id].get(key) == value for key, value in filters.items())
+            }
+
+        n_docs = len(self.lengths)
+        avg_length = self._total_length / n_docs or 1.0
+        idf = [math.log(1 + (n_docs - len(p) + 0.5) / (len(p) + 0.5)) for p in postings]
+        scored = []
+        for doc_id in candidates:
+            norm = self.k1 * (1 - self.b + self.b * self.lengths[doc_id] / avg_length)
+            score = 0.0
+            for weight, posting in zip(idf, postings):
+                freq = posting[doc_id]
+                score += weight * freq * (self.k1 + 1) / (freq + norm)
+            scored.append((score, doc_id))
+        return heapq.nlargest(limit, scored)
+
+
+class _TableIndex:
+    """An InvertedIndex over one table, kept current by indexing rows past the last id seen.
+
+    Posts and reviews are insert-only in this app, so new rows are all that
+    can change between searches.
+    """
+
+    def __init__(self, select_sql: str, to_document):
+        self.index = InvertedIndex()
+        self.last_id = 0
+        self._select_sql = select_sql
+        self._to_document = to_document
+        self._lock = threading.Lock()
+
+    def refresh(self) -> InvertedIndex:
+        with self._lock:
+            with get_connection() as conn:
+                result = conn.execute(
+                    text(self._select_sql).execution_options(stream_results=True, yield_per=INDEX_FETCH_SIZE),
+                    {"last_id": self.last_id}
+                )
+                for row in result:
+                    fields, meta = self._to_document(row)
+                    self.index.add(row[0], fields, **meta)
+                    self.last_id = max(self.last_id, row[0])
+            return self.index
+
+
+_post_index = _TableIndex(
+    "SELECT id, title, content FROM posts WHERE id > :last_id ORDER BY id",
+    # Title terms count double, mirroring setweight 'A' over 'B' in PostgreSQL
+    lambda row: ([(row[1], 2.0), (row[2], 1.0)], {}),
+)
+_review_index = _TableIndex(
+    "SELECT id, review_text, sentiment, post_id FROM reviews WHERE id > :last_id ORDER BY id",
+    lambda row: ([(row[1], 1.0)], {"sentiment": row[2], "post_id": row[3]}),
+)
+
+
+def _headline(value: str, terms: List[str]) -> str:
+    """A window of text around the first matching term, with matches highlighted"""
+    wanted = set(terms)
+
+    def matches(word: str) -> bool:
+        return any(_stem(w) in wanted for w in _WORD_RE.findall(word.lower()))
+
+    def mark(word: str) -> str:
+        return _WORD_RE.sub(
+            lambda m: f"{HIGHLIGHT}{m.group()}{HIGHLIGHT}" if _stem(m.group().lower()) in wanted else m.group(),
+            word
+        )
+
+    words = (value or "").split()
+    first = next((i for i, w in enumerate(words) if matches(w)), 0)
+    start = max(0, first - HEADLINE_WORDS // 3)
+    window = [mark(w) if matches(w) else w for w in words[start:start + HEADLINE_WORDS]]
+    prefix = "... " if start > 0 else ""
+    suffix = " ..." if start + HEADLINE_WORDS < len(words) else ""
+    return prefix + " ".join(window) + suffix
+
+
+# ---------- Backend selection ----------
+# A negative answer is re-checked now and then, so running apps switch to PostgreSQL
+# search once `manage.py migrate` finishes; a positive one is final.
+SEARCH_BACKEND_RECHECK_SECONDS = 60
+_SEARCH_INDEXES = tuple(f"ix_{table}_{SEARCH_COLUMN}" for table in ("posts", "reviews"))
+_pg_search_ready = False
+_pg_search_checked_at = None
+
+def _use_postgres() -> bool:
+    """PostgreSQL search needs the migrated search_vector columns"""
+    global _pg_search_ready, _pg_search_checked_at
+    if engine.dialect.name != "postgresql":
+        return False
+    if _pg_search_ready:
+        return True
+    now = time.monotonic()
+    if _pg_search_checked_at is not None and now - _pg_search_checked_at < SEARCH_BACKEND_RECHECK_SECONDS:
+        return False
+    _pg_search_checked_at = now
+    try:
+        with get_connection() as conn:
+            # The GIN indexes are built after the backfill, so valid ones mean complete columns
+            found = conn.execute(
+                text("""
+                    SELECT COUNT(*) FROM pg_index i
+                    JOIN pg_class c ON c.oid = i.indexrelid
+                    WHERE c.relname IN :index_names AND i.indisvalid
+                """).bindparams(bindparam("index_names", expanding=True)),
+                {"index_names": list(_SEARCH_INDEXES)}
+            ).scalar()
+        _pg_search_ready = found == len(_SEARCH_INDEXES)
+        if not _pg_search_ready:
+            print("Full-text columns missing; run 'python manage.py migrate'. Using in-memory search.")
+    except SQLAlchemyError as e:
+        print(f"Error checking search columns: {e}")
+    return _pg_search_ready
+
+
+def _paging(page: int, page_size: int) -> Tuple[int, int, int]:
+    page = max(1, min(int(page), MAX_SEARCH_PAGE))
+    page_size = _page_size(page_size)
+    return page, page_size, (page - 1) * page_size
+
+
+def _result(items: List[Dict], page: int, page_size: int, backend: str) -> Dict:
+    # One extra row was fetched to tell whether another page exists
+    return {
+        'items': items[:page_size],
+        'page': page,
+        'has_more': len(items) > page_size and page < MAX_SEARCH_PAGE,
+        'backend': backend,
+    }
+
+
+# ---------- Search API ----------
+def search_posts(query: str, page: int = 1, page_size: int = DEFAULT_PAGE_SIZE) -> Dict:
+    """Posts matching every term of ``query``, best first, with a highlighted fragment"""
+    page, page_size, offset = _paging(page, page_size)
+    if not query or not query.strip():
+        return _result([], page, page_size, "none")
+    try:
+        if _use_postgres():
+            with get_connection() as conn:
+                result = conn.execute(
+                    text(f"""
+                        SELECT hit.id, hit.title, hit.author_name, hit.created_at, hit.rank,
+                               ts_headline('english', hit.content, hit.q, :headline_options)
+                        FROM (
+                            SELECT p.id, p.title, p.author_name, p.created_at, p.content, q.q,
+                                   ts_rank_cd(p.{SEARCH_COLUMN}, q.q) AS rank
+                            FROM posts p, websearch_to_tsquery('english', :query) AS q(q)
+                            WHERE p.{SEARCH_COLUMN} @@ q.q
+                            ORDER BY rank DESC, p.id DESC
+                            LIMIT :limit OFFSET :offset
+                        ) hit
+                        ORDER BY hit.rank DESC, hit.id DESC
+                    """),
+                    {"query": query, "limit": page_size + 1, "offset": offset,
+                     "headline_options": _PG_HEADLINE_OPTIONS}
+                )
+                items = [
+                    {'id': row[0], 'title': row[1], 'author_name': row[2], 'created_at': row[3],
+                     'rank': float(row[4]), 'headline': row[5]}
+                    for row in result
+                ]
+            return _result(items, page, page_size, "postgres")
+
+        terms = analyze_terms(query)
+        hits = _post_index.refresh().search(terms, offset + page_size + 1)[offset:]
+        items = []
+        if hits:
+            with get_connection() as conn:
+                rows = {
+                    row[0]: row for row in conn.execute(
+                        text("SELECT id, title, author_name, created_at, content FROM posts WHERE id IN :ids")
+                        .bindparams(bindparam("ids", expanding=True))
+                        .columns(created_at=sa.DateTime),
+                        {"ids": [doc_id for _, doc_id in hits]}
+                    )
+                }
+            for score, doc_id in hits:
+                row = rows.get(doc_id)
+                if row:
+                    items.append({'id': row[0], 'title': row[1], 'author_name': row[2], 'created_at': row[3],
+                                  'rank': score, 'headline': _headline(row[4], terms)})
+        return _result(items, page, page_size, "memory")
+    except SQLAlchemyError as e:
+        print(f"Error searching posts: {e}")
+        return _result([], page, page_size, "error")
+
+
+def search_reviews(query: str, page: int = 1, page_size: int = DEFAULT_PAGE_SIZE,
+                   sentiment: Optional[str] = None, post_id: Optional[int] = None) -> Dict:
+    """Reviews matching every term of ``query``, best first, optionally by sentiment and/or post"""
+    page, page_size, offset = _paging(page, page_size)
+    if not query or not query.strip():
+        return _result([], page, page_size, "none")
+    try:
+        if _use_postgres():
+            params = {"query": query, "limit": page_size + 1, "offset": offset,
+                      "headline_options": _PG_HEADLINE_OPTIONS}
+            where = ""
+            if sentiment:
+                where += " AND r.sentiment = :sentiment"
+                params["sentiment"] = sentiment
+            if post_id is not None:
+                where += " AND r.post_id = :post_id"
+                params["post_id"] = post_id
+            with get_connection() as conn:
+                result = conn.execute(
+                    text(f"""
+                        SELECT hit.id, hit.post_id, hit.reviewer_name, hit.sentiment, hit.sentiment_score,
+                               hit.created_at, hit.rank,
+                               ts_headline('english', hit.review_text, hit.q, :headline_options)
+                        FROM (
+                            SELECT r.id, r.post_id, r.reviewer_name, r.sentiment, r.sentiment_score,
+                                   r.created_at, r.review_text, q.q,
+                                   ts_rank_cd(r.{SEARCH_COLUMN}, q.q) AS rank
+                            FROM reviews r, websearch_to_tsquery('english', :query) AS q(q)
+                            WHERE r.{SEARCH_COLUMN} @@ q.q{where}
+                            ORDER BY rank DESC, r.id DESC
+                            LIMIT :limit OFFSET :offset
+                        ) hit
+                        ORDER BY hit.rank DESC, hit.id DESC
+                    """),
+                    params
+                )
+                items = [_review_hit(row[:6], float(row[6]), row[7]) for row in result]
+            return _result(items, page, page_size, "postgres")
+
+        terms = analyze_terms(query)
+        filters = {}
+        if sentiment:
+            filters["sentiment"] = sentiment
+        if post_id is not None:
+            filters["post_id"] = post_id
+        hits = _review_index.refresh().search(terms, offset + page_size + 1, **filters)[offset:]
+        items = []
+        if hits:
+            with get_connection() as conn:
+                rows = {
+                    row[0]: row for row in conn.execute(
+                        text("""
+                            SELECT id, post_id, reviewer_name, sentiment, sentiment_score, created_at, review_text
+                            FROM reviews WHERE id IN :ids
+                        """).bindparams(bindparam("ids", expanding=True))
+                        .columns(created_at=sa.DateTime),
+                        {"ids": [doc_id for _, doc_id in hits]}
+                    )
+                }
+            for score, doc_id in hits:
+                row = rows.get(doc_id)
+                if row:
+                    items.append(_review_hit(row[:6], score, _headline(row[6], terms)))
+        return _result(items, page, page_size, "memory")
+    except SQLAlchemyError as e:
+        print(f"Error searching reviews: {e}")
+        return _result([], page, page_size, "error")
+
+
+def _review_hit(row, rank: float, headline: str) -> Dict:
+    return {
+        'id': row[0],
+        'post_id': row[1],
+        'reviewer_name': row[2],
+        'sentiment': row[3],
+        'sentiment_score': row[4],
+        'created_at': row[5],
+        'rank': rank,
+        'headline': headline,
+    }
@@ -0,0 +1,48 @@
+"""create_reviews_bulk against a live PostgreSQL database (DATABASE_URL)."""
+import os
+
+import pytest
+
+pytest.importorskip("psycopg2")
+if not os.environ.get("DATABASE_URL", "").startswith("postgresql"):
+    pytest.skip("needs DATABASE_URL pointing at PostgreSQL", allow_module_level=True)
+
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+import database
+
+try:
+    with database.engine.connect() as _conn:
+        _conn.execute(text("SELECT 1"))
+except SQLAlchemyError as e:
+    pytest.skip(f"PostgreSQL unreachable: {e}", allow_module_level=True)
+
+
+@pytest.fixture
+def post_id():
+    post_id = database.create_post("bulk import check", "body", "bulk-import-check")
+    yield post_id
+    with database.engine.begin() as conn:
+        conn.execute(text("DELETE FROM posts WHERE id = :id"), {"id": post_id})
+    database.invalidate_all()
+
+
+@pytest.mark.parametrize("use_copy", [True, False])
+def test_bad_row_does_not_abort_batch(post_id, use_copy):
+    rows = [
+        {"post_id": post_id, "reviewer_name": "a", "review_text": "Great post."},
+        # Passes validation but violates the posts foreign key, so the batch write fails
+        {"post_id": -1, "reviewer_name": "b", "review_text": "Orphan."},
+        {"post_id": post_id, "reviewer_name": "c", "review_text": "Terrible post."},
+    ]
+    report = database.create_reviews_bulk(rows, batch_size=10, workers=1, use_copy=use_copy)
+
+    assert report["method"] == ("copy" if use_copy else "insert")
+    assert (report["inserted"], report["failed"]) == (2, 1)
+    assert report["failures"][0]["index"] == 1
+    with database.engine.connect() as conn:
+        names = conn.execute(
+            text("SELECT reviewer_name FROM reviews WHERE post_id = :id ORDER BY reviewer_name"), {"id": post_id}
+        ).scalars().all()
+    assert names == ["a", "c"]
@@ -1,49 +1,328 @@
+import time
+
+_MODULE_IMPORT_STARTED = time.perf_counter()
+
 import re
-import nltk
-from typing import List
-from nltk.corpus import stopwords
-from nltk.sentiment import SentimentIntensityAnalyzer
-from nltk.tokenize import sent_tokenize, word_tokenize
-from collections import Counter
-from wordcloud import WordCloud
-import matplotlib.pyplot as plt
+import os
+import sys
 import io
-import base64
+import codecs
+import heapq
+import json
+import sqlite3
+import hashlib
+import threading
+import importlib.util
+import nltk
+from typing import Dict, Iterable, Iterator, List, Optional, Union
+from functools import cached_property, partial
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import islice
+from nltk.tokenize import sent_tokenize as _nltk_sent_tokenize, word_tokenize as _nltk_word_tokenize
+from collections import Counter, OrderedDict, deque
+
+# Heavy optional dependencies are only probed here; they are imported on first use
+NUMPY_AVAILABLE = importlib.util.find_spec("numpy") is not None
+TRANSFORMERS_AVAILABLE = importlib.util.find_spec("transformers") is not None
+
+# ---------- Lazy loading ----------
+# Seconds spent on each deferred import or resource load, see import_report()
+IMPORT_TIMINGS: Dict[str, float] = {}
+_lazy = {}
+_lazy_lock = threading.RLock()  # loaders may trigger other lazy loads
+
+def _load_once(name: str, loader):
+    if name not in _lazy:
+        with _lazy_lock:
+            if name not in _lazy:
+                started = time.perf_counter()
+                _lazy[name] = loader()
+                IMPORT_TIMINGS[name] = time.perf_counter() - started
+    return _lazy[name]
+
+def _numpy():
+    return _load_once("numpy", lambda: importlib.import_module("numpy"))
+
+# ---------- NLTK resources ----------
+# Checked once per process against local data directories, without touching
+# the network; only resources that are actually missing get downloaded.
+NLTK_RESOURCES = {
+    "stopwords": "corpora/stopwords",
+    "punkt": "tokenizers/punkt",
+    "punkt_tab": "tokenizers/punkt_tab",
+    "vader_lexicon": "sentiment/vader_lexicon.zip",
+}
+NLTK_DATA_DIR = os.environ.get("NLTK_DATA_DIR") or None
+NLTK_AUTO_DOWNLOAD = os.environ.get("NLTK_AUTO_DOWNLOAD", "1") != "0"
+if NLTK_DATA_DIR and NLTK_DATA_DIR not in nltk.data.path:
+    nltk.data.path.insert(0, NLTK_DATA_DIR)
+
+def _check_nltk_data() -> List[str]:
+    missing = []
+    for name, resource in NLTK_RESOURCES.items():
+        try:
+            nltk.data.find(resource)
+        except LookupError:
+            missing.append(name)
+    if missing and NLTK_AUTO_DOWNLOAD:
+        for name in missing:
+            nltk.download(name, quiet=True, download_dir=NLTK_DATA_DIR)
+    return missing
+
+def ensure_nltk_data() -> List[str]:
+    """Make sure NLTK data is available; returns the resources that were missing locally."""
+    return _load_once("nltk_data", _check_nltk_data)
+
+def _stopwords() -> set:
+    def load():
+        ensure_nltk_data()
+        from nltk.corpus import stopwords
+        return set(stopwords.words("english"))
+    return _load_once("stopwords", load)
+
+def _sentiment_analyzer_class():
+    def load():
+        ensure_nltk_data()
+        from nltk.sentiment import SentimentIntensityAnalyzer
+        return SentimentIntensityAnalyzer
+    return _load_once("nltk.sentiment", load)
+
+def sent_tokenize(text: str) -> List[str]:
+    ensure_nltk_data()
+    return _nltk_sent_tokenize(text)
+
+def word_tokenize(text: str, preserve_line: bool = False) -> List[str]:
+    ensure_nltk_data()
+    return _nltk_word_tokenize(text, preserve_line=preserve_line)
+
+def __getattr__(name):
+    # Module-level names that used to be built at import time
+    if name == "STOPWORDS":
+        return _stopwords()
+    if name == "sia":
+        return _get_sia()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def import_report() -> Dict:
+    """Time spent importing this module and on each lazy load so far."""
+    return {
+        "module_import_seconds": _MODULE_IMPORT_SECONDS,
+        "lazy_loads": dict(IMPORT_TIMINGS),
+        "heavy_modules_loaded": sorted(m for m in ("wordcloud", "matplotlib", "transformers", "torch", "numpy") if m in sys.modules),
+    }
+
+# ---------- Result Cache ----------
+_MISSING = object()
+
+class LRUCache:
+    """Bounded, thread-safe in-memory LRU with hit/miss/eviction counters."""
+
+    def __init__(self, maxsize: int = 256):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return default
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self) -> Dict:
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+class AnalysisCache(LRUCache):
+    """LRU of analysis results with an optional SQLite store behind it.
+
+    Values must be JSON serialisable. Entries evicted from memory stay on
+    disk, so a restarted process can still answer repeated inputs with one
+    lookup.
+    """
+
+    def __init__(self, maxsize: int = 1024, path: Optional[str] = None):
+        super().__init__(maxsize)
+        self.path = path
+        self.disk_hits = 0
+        self._db = None
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("CREATE TABLE IF NOT EXISTS analysis_cache (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            self._db.commit()
+        self._db_lock = threading.Lock()
+
+    def get(self, key, default=None):
+        value = super().get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        if self._db is None:
+            return default
+        with self._db_lock:
+            row = self._db.execute("SELECT value FROM analysis_cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return default
+        self.disk_hits += 1
+        value = json.loads(row[0])
+        super().put(key, value)
+        return value
+
+    def put(self, key, value):
+        super().put(key, value)
+        if self._db is not None:
+            with self._db_lock:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO analysis_cache (key, value) VALUES (?, ?)",
+                    (key, json.dumps(value)),
+                )
+                self._db.commit()
+
+    def clear(self):
+        super().clear()
+        if self._db is not None:
+            with self._db_lock:
+                self._db.execute("DELETE FROM analysis_cache")
+                self._db.commit()
+
+    def stats(self) -> Dict:
+        stats = super().stats()
+        stats["disk_hits"] = self.disk_hits
+        stats["path"] = self.path
+        return stats
+
+def cache_key(kind: str, text: str, **params) -> str:
+    """Content address for a result: hash of the stage name, text and parameters."""
+    h = hashlib.sha256()
+    h.update(kind.encode("utf-8"))
+    h.update(b"\0")
+    h.update(json.dumps(params, sort_keys=True, default=str).encode("utf-8"))
+    h.update(b"\0")
+    h.update(text.encode("utf-8"))
+    return h.hexdigest()
+
+analysis_cache = AnalysisCache(
+    maxsize=int(os.environ.get("ANALYSIS_CACHE_SIZE", "1024")),
+    path=os.environ.get("ANALYSIS_CACHE_PATH") or None,
+)
+
+# ---------- Shared Tokenization ----------
+_URL_RE = re.compile(r"http\S+|www\.\S+")
+_SPACE_RE = re.compile(r"\s+")
+_NON_WORD_RE = re.compile(r"[^A-Za-z0-9₹\s]")
+_WORD_RE = re.compile(r"[^\W\d_]+")
+_WORD_OR_BREAK_RE = re.compile(r"\w+|\n")
+
+class Document:
+    """One input text, sentence-split and tokenized once.
+
+    Every view (sentences, raw words, filtered tokens, cleaned tokens and
+    their counts) is computed on first access and then reused, so
+    clean_text, tokenize, the summarizer and word frequencies can all share
+    the same tokenization work.
+    """
 
-# Optional transformers import
-try:
-    from transformers import pipeline
-    TRANSFORMERS_AVAILABLE = True
-except ImportError:
-    TRANSFORMERS_AVAILABLE = False
-    pipeline = None
+    def __init__(self, text: str):
+        self.text = text or ""
 
-# ---------- Download NLTK resources ----------
-nltk.download("stopwords", quiet=True)
-nltk.download("punkt", quiet=True)
-nltk.download("punkt_tab", quiet=True)
-nltk.download("vader_lexicon", quiet=True)
+    @cached_property
+    def sentences(self) -> List[str]:
+        return sent_tokenize(self.text) if self.text.strip() else []
 
-STOPWORDS = set(stopwords.words("english"))
+    @cached_property
+    def sentence_words(self) -> List[List[str]]:
+        # Same tokens word_tokenize(text) gives, kept per sentence
+        return [word_tokenize(s, preserve_line=True) for s in self.sentences]
+
+    @cached_property
+    def sentence_tokens(self) -> List[List[str]]:
+        """Lowercase alphabetic non-stopword tokens of each sentence."""
+        stop_words = _stopwords()
+        return [
+            [lw for lw in (w.lower() for w in words if w.isalpha()) if lw not in stop_words]
+            for words in self.sentence_words
+        ]
+
+    @cached_property
+    def tokens(self) -> List[str]:
+        return [t for tokens in self.sentence_tokens for t in tokens]
+
+    @cached_property
+    def counts(self) -> Counter:
+        return Counter(self.tokens)
+
+    @cached_property
+    def cleaned_tokens(self) -> List[str]:
+        text = _SPACE_RE.sub(" ", self.text.strip())  # remove extra spaces
+        text = _URL_RE.sub("", text)  # remove URLs
+        text = _NON_WORD_RE.sub("", text)  # keep letters, numbers, ₹
+        tokens = [t.lower() for t in word_tokenize(text)]
+        stop_words = _stopwords()
+        return [t for t in tokens if t not in stop_words and len(t) > 1]
+
+    @cached_property
+    def cleaned(self) -> str:
+        return " ".join(self.cleaned_tokens)
+
+    @cached_property
+    def cleaned_counts(self) -> Counter:
+        return Counter(self.cleaned_tokens)
+
+    def stats(self) -> Dict:
+        return {
+            "characters": len(self.text),
+            "words": len(self.text.split()),
+            "sentences": len(self.sentences),
+            "paragraphs": len(self.text.split("\n\n")),
+        }
+
+TextLike = Union[str, Document]
+
+def as_document(text: TextLike) -> Document:
+    return text if isinstance(text, Document) else Document(text)
+
+def _text_of(text: TextLike) -> str:
+    return text.text if isinstance(text, Document) else text
 
 # ---------- Text Cleaning ----------
-def clean_text(text: str) -> str:
-    text = text.strip()
-    text = re.sub(r"\s+", " ", text)  # remove extra spaces
-    text = re.sub(r"http\S+|www\.\S+", "", text)  # remove URLs
-    text = re.sub(r"[^A-Za-z0-9₹\s]", "", text)  # keep letters, numbers, ₹
-    tokens = [t.lower() for t in word_tokenize(text)]
-    tokens = [t for t in tokens if t not in STOPWORDS and len(t) > 1]
-    return " ".join(tokens)
-
-def tokenize(text: str) -> List[str]:
-    return [t for t in word_tokenize(text.lower()) if t.isalpha() and t not in STOPWORDS]
+def clean_text(text: TextLike) -> str:
+    return as_document(text).cleaned
+
+def tokenize(text: TextLike) -> List[str]:
+    return list(as_document(text).tokens)
 
 # ---------- Sentiment Analysis ----------
-sia = SentimentIntensityAnalyzer()
+def _get_sia():
+    return _load_once("sia", lambda: _sentiment_analyzer_class()())
 
-def analyze(text: str):
-    scores = sia.polarity_scores(text)
+def _label_scores(scores) -> Dict:
     comp = scores["compound"]
     if comp >= 0.05:
         label = "positive"
@@ -59,37 +338,118 @@ def analyze(text: str):
         "neutral": scores.get("neu", 0.0),
     }
 
+def analyze(text: str):
+    return _label_scores(_get_sia().polarity_scores(text))
+
+# ---------- Batched Sentiment Analysis ----------
+# Each pool worker builds its own analyzer once, so the VADER lexicon is
+# loaded per process instead of being pickled along with every chunk.
+_worker_sia = None
+
+def _init_sentiment_worker():
+    global _worker_sia
+    _worker_sia = _sentiment_analyzer_class()()
+
+def _analyze_chunk(texts: List[str]) -> List[Dict]:
+    analyzer = _worker_sia or _get_sia()
+    return [_label_scores(analyzer.polarity_scores(t)) for t in texts]
+
+def _chunked(texts: Iterable[str], size: int) -> Iterator[List[str]]:
+    it = iter(texts)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+def _bounded_map(pool, func, items: Iterator, window: int) -> Iterator:
+    """Like pool.map, in order, but with at most ``window`` items submitted at once."""
+    items = iter(items)
+    pending = deque(pool.submit(func, item) for item in islice(items, window))
+    while pending:
+        result = pending.popleft().result()
+        next_item = next(items, None)
+        if next_item is not None:
+            pending.append(pool.submit(func, next_item))
+        yield result
+
+def iter_analyze_many(texts: Iterable[str], workers: Optional[int] = None, chunksize: int = 500) -> Iterator[Dict]:
+    """Yield analyze() results for texts, in input order, as chunks finish.
+
+    Only about ``2 * workers`` chunks are in flight at any time, so memory
+    stays flat however long the input iterable is.
+    """
+    if chunksize < 1:
+        raise ValueError("chunksize must be at least 1")
+    workers = workers or os.cpu_count() or 1
+    chunks = _chunked(texts, chunksize)
+
+    if workers == 1:
+        for chunk in chunks:
+            yield from _analyze_chunk(chunk)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_sentiment_worker) as pool:
+        for results in _bounded_map(pool, _analyze_chunk, chunks, 2 * workers):
+            yield from results
+
+def analyze_many(texts: Iterable[str], workers: Optional[int] = None, chunksize: int = 500) -> List[Dict]:
+    """Score many texts on a process pool; same result shape as analyze()."""
+    texts = list(texts)
+    if workers is None and len(texts) <= chunksize:
+        # Not worth paying for process start-up on a single chunk
+        workers = 1
+    return list(iter_analyze_many(texts, workers=workers, chunksize=chunksize))
+
 # ---------- Extractive Summarizer ----------
 class Summarizer:
-    def summarize(self, text: str, max_length: int = 120) -> str:
-        if not text or not text.strip():
+    top_n = 3
+
+    def summarize(self, text: TextLike, max_length: int = 120) -> str:
+        doc = as_document(text)
+        if not doc.text.strip():
             return ""
-        sentences = sent_tokenize(text)
+        sentences = doc.sentences
 
         # If only one sentence → return keywords
         if len(sentences) == 1:
-            tokens = [w.lower() for w in word_tokenize(text) if w.isalpha() and w.lower() not in STOPWORDS]
-            return " ".join(tokens[:max_length])
+            return " ".join(doc.tokens[:max_length])
 
-        # Word frequencies
-        words = [w.lower() for w in word_tokenize(text) if w.isalpha() and w.lower() not in STOPWORDS]
-        freqs = Counter(words)
+        top = self._select(doc)
 
-        s_scores = []
-        for s in sentences:
-            tokens = [w.lower() for w in word_tokenize(s) if w.isalpha()]
-            score = sum(freqs.get(w, 0) for w in tokens if w not in STOPWORDS)
-            s_scores.append((score, s))
+        # Preserve original order
+        ordered = [sentences[i] for i in sorted(top)]
+        return self._assemble(ordered, max_length)
 
-        # Sort by score
-        s_scores.sort(key=lambda x: x[0], reverse=True)
+    def _select(self, doc: Document) -> List[int]:
+        """Indices of the top-scoring sentences, best first."""
+        # Word frequencies
+        freqs = doc.counts
+        scores = [sum(freqs.get(w, 0) for w in tokens) for tokens in doc.sentence_tokens]
 
-        # Pick top 2–3 sentences
-        top_sentences = [s for _, s in s_scores[:3]]
+        # Sort by score, ties keep document order
+        ranked = sorted(range(len(scores)), key=lambda i: scores[i], reverse=True)
+        return self._distinct(ranked, doc.sentences, self.top_n)
 
-        # Preserve original order
-        ordered = [s for s in sentences if s in top_sentences]
+    @staticmethod
+    def _distinct(ranked: Iterable, sentences: List[str], n: int) -> List:
+        """First n of ``ranked`` whose sentence text was not already picked.
+
+        Repeated sentences score identically, so without this a repeated
+        paragraph fills the summary with copies of itself.
+        """
+        picked, seen = [], set()
+        for i in ranked:
+            sentence = sentences[i].strip()
+            if sentence not in seen:
+                seen.add(sentence)
+                picked.append(i)
+                if len(picked) == n:
+                    break
+        return picked
 
+    @staticmethod
+    def _assemble(ordered: List[str], max_length: int) -> str:
         # Join complete sentences, but stop if we exceed max_length
         summary = []
         word_count = 0
@@ -102,33 +462,679 @@ class Summarizer:
 
         return " ".join(summary)
 
+
+class VectorizedSummarizer(Summarizer):
+    """Extractive summarizer backed by a sparse sentence-term matrix.
+
+    The matrix is built once in COO form (parallel row/column arrays) and all
+    scoring is done with NumPy, so cost is linear in the number of tokens.
+
+    mode="frequency" is the classic word-frequency score; with the default
+    terms="tokens" it scores the same Document.sentence_tokens as Summarizer
+    and picks the same sentences. mode="textrank" ranks sentences by PageRank
+    centrality over TF-IDF cosine similarity; the similarity matrix is never
+    materialised, each power iteration is two sparse products through the
+    term space.
+
+    terms="regex" skips word_tokenize for very large documents: the whole
+    text is split into word-character runs in one regex pass and, as with
+    sentence_tokens, only alphabetic non-stopword terms are kept. Contractions
+    split differently ("don't" gives "don" and "t" rather than "do" and
+    "n't"), so scores can differ slightly from the token-based ones.
+    """
+
+    MODES = ("frequency", "textrank")
+    TERMS = ("tokens", "regex")
+
+    def __init__(self, mode: str = "frequency", damping: float = 0.85, max_iter: int = 50, tol: float = 1e-6,
+                 terms: str = "tokens"):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown summarizer mode {mode!r}, expected one of {self.MODES}")
+        if terms not in self.TERMS:
+            raise ValueError(f"Unknown term source {terms!r}, expected one of {self.TERMS}")
+        self.mode = mode
+        self.damping = damping
+        self.max_iter = max_iter
+        self.tol = tol
+        self.terms = terms
+
+    def _select(self, doc: Document) -> List[int]:
+        np = _numpy()
+        rows, cols, n_sentences, n_terms = self._matrix(doc)
+        if self.mode == "textrank":
+            scores = self._textrank_scores(rows, cols, n_sentences, n_terms)
+        else:
+            freqs = np.bincount(cols, minlength=n_terms)
+            scores = np.bincount(rows, weights=freqs[cols], minlength=n_sentences)
+        # Stable sort: ties keep document order, as in Summarizer
+        ranked = np.argsort(-scores, kind="stable")
+        return self._distinct(ranked.tolist(), doc.sentences, self.top_n)
+
+    @staticmethod
+    def _encode(flat: List[str]):
+        """Column id of every term and the vocabulary, in first-seen order"""
+        np = _numpy()
+        # dict lookups run in C through map(); faster here than np.unique on a string array
+        ids = {term: i for i, term in enumerate(dict.fromkeys(flat))}
+        return np.fromiter(map(ids.__getitem__, flat), dtype=np.int64, count=len(flat)), list(ids)
+
+    def _matrix(self, doc: Document):
+        """(row, col) pairs of every term occurrence, with sentence and vocabulary sizes"""
+        np = _numpy()
+        n_sentences = len(doc.sentences)
+        if self.terms == "tokens":
+            flat = [t for tokens in doc.sentence_tokens for t in tokens]
+            lengths = np.fromiter(map(len, doc.sentence_tokens), dtype=np.int64, count=n_sentences)
+            cols, vocab = self._encode(flat)
+            return np.repeat(np.arange(n_sentences), lengths), cols, n_sentences, len(vocab)
+
+        # One regex pass over all sentences; "\n" marks where each one ends
+        joined = "\n".join(s.replace("\n", " ") for s in doc.sentences).lower() + "\n"
+        cols, vocab = self._encode(_WORD_OR_BREAK_RE.findall(joined))
+        stop_words = _stopwords()
+        is_break = np.fromiter((v == "\n" for v in vocab), dtype=bool, count=len(vocab))
+        # Breaks are not alphabetic either, so this drops them too
+        dropped = np.fromiter((not v.isalpha() or v in stop_words for v in vocab), dtype=bool, count=len(vocab))
+        # A term's sentence is the number of breaks before it
+        breaks = is_break[cols]
+        rows = np.cumsum(breaks) - breaks
+        keep = ~dropped[cols]
+        return rows[keep], cols[keep], n_sentences, len(vocab)
+
+    def _textrank_scores(self, rows, cols, n_sentences: int, n_terms: int):
+        np = _numpy()
+        if n_terms == 0:
+            return np.zeros(n_sentences)
+        # Collapse repeated (sentence, term) pairs into term counts
+        keys, tf = np.unique(rows * n_terms + cols, return_counts=True)
+        rows, cols = keys // n_terms, keys % n_terms
+        df = np.bincount(cols, minlength=n_terms)
+        idf = np.log((1.0 + n_sentences) / (1.0 + df)) + 1.0
+        vals = (1.0 + np.log(tf)) * idf[cols]
+        norms = np.sqrt(np.bincount(rows, weights=vals ** 2, minlength=n_sentences))
+        vals = vals / np.where(norms > 0, norms, 1.0)[rows]
+        self_sim = np.bincount(rows, weights=vals ** 2, minlength=n_sentences)
+
+        def similarity(u):
+            # (X @ X.T - diag) @ u without building the n x n matrix
+            through_terms = np.bincount(cols, weights=vals * u[rows], minlength=n_terms)
+            return np.bincount(rows, weights=vals * through_terms[cols], minlength=n_sentences) - self_sim * u
+
+        degree = similarity(np.ones(n_sentences))
+        inv_degree = np.divide(1.0, degree, out=np.zeros(n_sentences), where=degree > 0)
+        rank = np.full(n_sentences, 1.0 / n_sentences)
+        for _ in range(self.max_iter):
+            new_rank = (1.0 - self.damping) / n_sentences + self.damping * similarity(rank * inv_degree)
+            if np.abs(new_rank - rank).sum() < self.tol:
+                rank = new_rank
+                break
+            rank = new_rank
+        return rank
+
+# ---------- Streaming Summarizer ----------
+def iter_text_chunks(fileobj, chunk_size: int = 1 << 20, encoding: str = "utf-8") -> Iterator[str]:
+    """Read a binary or text file object in decoded chunks of about chunk_size bytes."""
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    while True:
+        raw = fileobj.read(chunk_size)
+        if not raw:
+            break
+        yield decoder.decode(raw) if isinstance(raw, bytes) else raw
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+
+class StreamingSummarizer:
+    """Extractive summarizer for text that arrives in chunks.
+
+    Keeps running term frequencies and a min-heap of the best candidate
+    sentences seen so far; everything else is dropped as soon as it is
+    scored, so memory is bounded by ``candidates`` and ``max_terms`` rather
+    than by document size. Candidates are admitted on their score against
+    the frequencies so far (normalised by tokens seen) and re-scored against
+    the final frequencies in summary().
+    """
+
+    def __init__(self, top_n: int = 3, candidates: int = 64, max_terms: int = 50000, max_sentence_chars: int = 10000):
+        self.top_n = top_n
+        self.candidates = max(candidates, top_n)
+        self.max_terms = max_terms
+        self.max_sentence_chars = max_sentence_chars
+        self.freqs = Counter()
+        self.total_terms = 0
+        self.sentence_count = 0
+        self._heap = []
+        self._heap_sentences = set()
+        self._first_terms = []
+        self._carry = ""
+
+    def feed(self, chunk: str):
+        self._carry += chunk
+        sentences = sent_tokenize(self._carry) if self._carry.strip() else []
+        # The last sentence may continue in the next chunk, so hold it back
+        if len(sentences) > 1 or len(self._carry) > self.max_sentence_chars:
+            if len(sentences) > 1:
+                # Keep the raw tail (with its trailing whitespace) rather than the stripped sentence
+                last = sentences.pop()
+                self._carry = self._carry[self._carry.rfind(last):]
+            else:
+                self._carry = ""
+            for s in sentences:
+                self._add_sentence(s)
+
+    def _add_sentence(self, sentence: str):
+        stop_words = _stopwords()
+        terms = [w for w in _WORD_RE.findall(sentence.lower()) if w not in stop_words]
+        self.freqs.update(terms)
+        self.total_terms += len(terms)
+        self.sentence_count += 1
+        if self.sentence_count == 1:
+            self._first_terms = terms
+
+        score = sum(self.freqs[t] for t in terms) / max(self.total_terms, 1)
+        # Ties favour earlier sentences, as in Summarizer
+        entry = (score, -self.sentence_count, sentence, terms)
+        # A repeated sentence keeps its one slot; summary() re-scores it from freqs anyway
+        if sentence not in self._heap_sentences:
+            if len(self._heap) < self.candidates:
+                heapq.heappush(self._heap, entry)
+                self._heap_sentences.add(sentence)
+            elif entry > self._heap[0]:
+                dropped = heapq.heapreplace(self._heap, entry)
+                self._heap_sentences.discard(dropped[2])
+                self._heap_sentences.add(sentence)
+
+        if len(self.freqs) > self.max_terms:
+            # Drop the long tail of rare terms; they barely move sentence scores
+            self.freqs = Counter(dict(self.freqs.most_common(self.max_terms // 2)))
+
+    def add_text(self, text: str):
+        """Add a complete text (e.g. one review): all of its sentences, nothing held back."""
+        for sentence in sent_tokenize(text) if text.strip() else []:
+            self._add_sentence(sentence)
+
+    def to_state(self) -> Dict:
+        """JSON-serialisable snapshot, so a summary can be extended later with from_state()."""
+        if self._carry.strip():
+            self._add_sentence(self._carry)
+            self._carry = ""
+        return {
+            "top_n": self.top_n,
+            "candidates": self.candidates,
+            "max_terms": self.max_terms,
+            "max_sentence_chars": self.max_sentence_chars,
+            "freqs": dict(self.freqs),
+            "total_terms": self.total_terms,
+            "sentence_count": self.sentence_count,
+            "heap": [list(entry) for entry in self._heap],
+            "first_terms": self._first_terms,
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict) -> "StreamingSummarizer":
+        summarizer = cls(state["top_n"], state["candidates"], state["max_terms"], state["max_sentence_chars"])
+        summarizer.freqs = Counter(state["freqs"])
+        summarizer.total_terms = state["total_terms"]
+        summarizer.sentence_count = state["sentence_count"]
+        # Lists keep heap order; entries go back to tuples so they compare as before
+        summarizer._heap = [tuple(entry) for entry in state["heap"]]
+        summarizer._heap_sentences = {entry[2] for entry in summarizer._heap}
+        summarizer._first_terms = state["first_terms"]
+        return summarizer
+
+    def summary(self, max_length: int = 120) -> str:
+        if self._carry.strip():
+            self._add_sentence(self._carry)
+            self._carry = ""
+        if self.sentence_count == 0:
+            return ""
+        if self.sentence_count == 1:
+            return " ".join(self._first_terms[:max_length])
+
+        ranked = sorted(
+            self._heap,
+            key=lambda e: (-sum(self.freqs.get(t, 0) for t in e[3]), -e[1]),
+        )
+        sentences = [e[2] for e in ranked]
+        rescored = [ranked[i] for i in Summarizer._distinct(range(len(ranked)), sentences, self.top_n)]
+        ordered = [e[2] for e in sorted(rescored, key=lambda e: -e[1])]
+        return Summarizer._assemble(ordered, max_length)
+
+
+def summarize_stream(chunks: Iterable[str], max_length: int = 120, **kwargs) -> str:
+    summarizer = StreamingSummarizer(**kwargs)
+    for chunk in chunks:
+        summarizer.feed(chunk)
+    return summarizer.summary(max_length)
+
+# ---------- Word Frequencies ----------
+class FrequencyCounter:
+    """Incremental word (or n-gram) counts over a stream of text chunks.
+
+    Counters from different documents or worker processes can be merged,
+    and top(k) selects with a heap instead of sorting the whole vocabulary.
+    """
+
+    def __init__(self, ngram: int = 1):
+        if ngram < 1:
+            raise ValueError("ngram must be at least 1")
+        self.ngram = ngram
+        self.counts = Counter()
+
+    def update_tokens(self, tokens: List[str]) -> "FrequencyCounter":
+        if self.ngram == 1:
+            self.counts.update(tokens)
+        else:
+            n = self.ngram
+            self.counts.update(" ".join(tokens[i:i + n]) for i in range(len(tokens) - n + 1))
+        return self
+
+    def update(self, chunks: Iterable[TextLike]) -> "FrequencyCounter":
+        """Count raw text chunks, cleaned the same way as clean_text()."""
+        for chunk in chunks:
+            self.update_tokens(as_document(chunk).cleaned_tokens)
+        return self
+
+    def merge(self, other: "FrequencyCounter") -> "FrequencyCounter":
+        if other.ngram != self.ngram:
+            raise ValueError("Cannot merge counters with different n-gram sizes")
+        self.counts.update(other.counts)
+        return self
+
+    def top(self, k: Optional[int] = None) -> List:
+        # Counter.most_common(k) uses heapq.nlargest, O(n log k)
+        return self.counts.most_common(k)
+
+    def __len__(self):
+        return len(self.counts)
+
+def _count_chunk(texts: List[str], ngram: int) -> Counter:
+    return FrequencyCounter(ngram).update(texts).counts
+
+def top_words(texts: Iterable[TextLike], k: int = 20, ngram: int = 1, workers: Optional[int] = 1,
+              chunksize: int = 500) -> List:
+    """Top-k words across a corpus, counted in chunks and optionally on a process pool."""
+    counter = FrequencyCounter(ngram)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for chunk in _chunked(texts, chunksize):
+            counter.update(chunk)
+        return counter.top(k)
+    chunks = (list(map(_text_of, c)) for c in _chunked(texts, chunksize))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for counts in _bounded_map(pool, partial(_count_chunk, ngram=ngram), chunks, 2 * workers):
+            counter.counts.update(counts)
+    return counter.top(k)
+
 # ---------- Word Cloud ----------
 class WordCloudGenerator:
-    def generate_image(self, text: str, width: int = 800, height: int = 400, max_words: int = 200, colormap: str = "viridis"):
-        """Generate word cloud and return as PIL Image"""
-        if not text or not text.strip():
-            return None
-        
+    def __init__(self, cache_size: int = 32, render_workers: int = 2):
+        # (frequency fingerprint, width, height, max_words, colormap) -> (image, PNG bytes)
+        self._renders = LRUCache(cache_size)
+        self._render_seconds = LRUCache(cache_size)
+        self._render_workers = render_workers
+        self._pool = None
+        # slot -> (render key, Future) of the full render in flight for that caller
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def fingerprint(frequencies) -> str:
+        items = sorted(dict(frequencies).items())
+        return hashlib.sha1(json.dumps(items).encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _counts(text: TextLike) -> Counter:
+        if isinstance(text, Document):
+            return text.cleaned_counts
+        return Counter(t for t in text.split() if len(t) > 1)
+
+    def render(self, frequencies, width: int = 800, height: int = 400, max_words: int = 200, colormap: str = "viridis"):
+        """Return (PIL Image, PNG bytes) for word frequencies, reusing earlier layouts."""
+        frequencies = dict(frequencies)
+        if not frequencies:
+            return None, None
+        key = (self.fingerprint(frequencies), width, height, max_words, colormap)
+        cached = self._renders.get(key)
+        if cached is not None:
+            return cached
+
+        from wordcloud import WordCloud
         wc = WordCloud(width=width, height=height, background_color="white", max_words=max_words, colormap=colormap)
-        image = wc.generate(text).to_image()
+        image = wc.generate_from_frequencies(frequencies).to_image()
+        buf = io.BytesIO()
+        image.save(buf, format="PNG")
+        rendered = (image, buf.getvalue())
+        self._renders.put(key, rendered)
+        return rendered
+
+    def generate_image(self, text: Optional[TextLike] = None, width: int = 800, height: int = 400, max_words: int = 200,
+                       colormap: str = "viridis", frequencies=None):
+        """Generate word cloud and return as PIL Image"""
+        if frequencies is None:
+            if text is None or not _text_of(text).strip():
+                return None
+            frequencies = self._counts(text)
+        image, _ = self.render(frequencies, width=width, height=height, max_words=max_words, colormap=colormap)
         return image
 
-    def frequencies(self, text: str):
-        tokens = [t for t in text.split() if len(t) > 1]
-        freq = Counter(tokens)
-        return sorted(freq.items(), key=lambda x: x[1], reverse=True)
+    def render_stats(self) -> Dict:
+        return self._renders.stats()
+
+    def _executor(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self._render_workers, thread_name_prefix="wordcloud")
+        return self._pool
+
+    def _timed_render(self, key, frequencies, width, height, max_words, colormap):
+        started = time.perf_counter()
+        rendered = self.render(frequencies, width=width, height=height, max_words=max_words, colormap=colormap)
+        self._render_seconds.put(key, time.perf_counter() - started)
+        return rendered
+
+    def render_progressive(self, frequencies, width: int = 800, height: int = 400, max_words: int = 200,
+                           colormap: str = "viridis", slot: str = "default", preview_scale: float = 0.25) -> Dict:
+        """Fast preview now, full-resolution layout on a worker thread.
+
+        Returns a dict with "done", "image", "png" and per-stage "timings".
+        While the full render is still running, image/png hold a downscaled
+        preview and "future" resolves to the full (image, PNG bytes). Each
+        slot (e.g. one per user session) has at most one full render in
+        flight; asking for different parameters cancels the stale one.
+        """
+        frequencies = dict(frequencies)
+        if not frequencies:
+            return {"done": True, "image": None, "png": None, "timings": {}}
+        key = (self.fingerprint(frequencies), width, height, max_words, colormap)
+        full = self._renders.get(key)
+        if full is not None:
+            return {"done": True, "image": full[0], "png": full[1], "timings": {"full": self._render_seconds.get(key)}}
+
+        with self._lock:
+            pending = self._pending.get(slot)
+            if pending is not None and pending[0] != key:
+                # Parameters changed; a render that has not started yet is dropped
+                pending[1].cancel()
+                pending = None
+            if pending is None:
+                future = self._executor().submit(self._timed_render, key, frequencies, width, height, max_words, colormap)
+                self._pending[slot] = (key, future)
+            else:
+                future = pending[1]
+
+        if future.done() and not future.cancelled():
+            with self._lock:
+                if self._pending.get(slot, (None, None))[1] is future:
+                    del self._pending[slot]
+            if future.exception() is not None:
+                return {"done": True, "image": None, "png": None, "error": str(future.exception()), "timings": {}}
+            image, png = future.result()
+            return {"done": True, "image": image, "png": png, "timings": {"full": self._render_seconds.get(key)}}
+
+        started = time.perf_counter()
+        preview_image, preview_png = self.render(
+            frequencies,
+            width=max(int(width * preview_scale), 50),
+            height=max(int(height * preview_scale), 25),
+            max_words=min(max_words, 100),
+            colormap=colormap,
+        )
+        preview_seconds = time.perf_counter() - started
+        return {
+            "done": False,
+            "image": preview_image,
+            "png": preview_png,
+            "future": future,
+            "timings": {"preview": preview_seconds},
+        }
+
+    def frequencies(self, text: TextLike, top_k: Optional[int] = None):
+        # most_common(k) heap-selects the top k instead of sorting every token
+        return self._counts(text).most_common(top_k)
 
 # ---------- Create objects ----------
-extractive_summarizer = Summarizer()
+extractive_summarizer = VectorizedSummarizer() if NUMPY_AVAILABLE else Summarizer()
 wcg = WordCloudGenerator()
 
 # Initialize abstractive summarizer (will be loaded on demand to improve startup time)
-_abstractive_summarizer = None
+# Inference backends, all returning a transformers summarization pipeline:
+#   fp32 - the stock PyTorch model
+#   int8 - PyTorch with dynamic int8 quantization of the Linear layers
+#   onnx - exported ONNX Runtime graph (needs optimum[onnxruntime])
+ABSTRACTIVE_MODEL = os.environ.get("ABSTRACTIVE_MODEL", "facebook/bart-large-cnn")
+ABSTRACTIVE_BACKENDS = ("fp32", "int8", "onnx")
+ABSTRACTIVE_BACKEND = os.environ.get("ABSTRACTIVE_BACKEND", "fp32")
+# Where the exported ONNX graph is kept, so the export only happens once
+ABSTRACTIVE_ONNX_DIR = os.environ.get("ABSTRACTIVE_ONNX_DIR") or None
+
+def _load_abstractive_pipeline(backend: str):
+    from transformers import AutoTokenizer, pipeline
+    if backend == "fp32":
+        return pipeline("summarization", model=ABSTRACTIVE_MODEL)
 
-def get_abstractive_summarizer():
-    global _abstractive_summarizer
+    tokenizer = AutoTokenizer.from_pretrained(ABSTRACTIVE_MODEL)
+    if backend == "int8":
+        import torch
+        from transformers import AutoModelForSeq2SeqLM
+        model = AutoModelForSeq2SeqLM.from_pretrained(ABSTRACTIVE_MODEL)
+        model.eval()
+        model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        return pipeline("summarization", model=model, tokenizer=tokenizer)
+
+    try:
+        from optimum.onnxruntime import ORTModelForSeq2SeqLM
+    except ImportError:
+        raise ImportError("The onnx backend needs 'optimum[onnxruntime]'. Please install it or choose another backend.")
+    if ABSTRACTIVE_ONNX_DIR and os.path.isdir(ABSTRACTIVE_ONNX_DIR) and os.listdir(ABSTRACTIVE_ONNX_DIR):
+        model = ORTModelForSeq2SeqLM.from_pretrained(ABSTRACTIVE_ONNX_DIR)
+    else:
+        model = ORTModelForSeq2SeqLM.from_pretrained(ABSTRACTIVE_MODEL, export=True)
+        if ABSTRACTIVE_ONNX_DIR:
+            model.save_pretrained(ABSTRACTIVE_ONNX_DIR)
+    return pipeline("summarization", model=model, tokenizer=tokenizer)
+
+def get_abstractive_summarizer(backend: Optional[str] = None):
+    backend = backend or ABSTRACTIVE_BACKEND
+    if backend not in ABSTRACTIVE_BACKENDS:
+        raise ValueError(f"Unknown abstractive backend {backend!r}, expected one of {ABSTRACTIVE_BACKENDS}")
     if not TRANSFORMERS_AVAILABLE:
         raise ImportError("Transformers library is not available. Please install it to use abstractive summarization.")
-    if _abstractive_summarizer is None:
-        _abstractive_summarizer = pipeline("summarization", model="facebook/bart-large-cnn")
-    return _abstractive_summarizer
+    return _load_once(f"abstractive:{backend}", lambda: _load_abstractive_pipeline(backend))
+
+# ---------- Chunked Abstractive Summarization ----------
+# Room left in the model window for BOS/EOS and other special tokens
+_SPECIAL_TOKEN_MARGIN = 16
+_MAX_REDUCE_LEVELS = 8
+
+def _chunk_by_tokens(sentences: List[str], tokenizer, budget: int) -> List[str]:
+    """Greedily pack whole sentences into chunks of at most budget tokens."""
+    chunks = []
+    current = []
+    used = 0
+    for sentence in sentences:
+        n_tokens = len(tokenizer.encode(sentence, add_special_tokens=False))
+        if current and used + n_tokens > budget:
+            chunks.append(" ".join(current))
+            current = []
+            used = 0
+        # A single over-long sentence becomes its own chunk and is truncated by the pipeline
+        current.append(sentence)
+        used += n_tokens
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+def summarize_abstractive(text: TextLike, max_length: int = 60, min_length: int = 20, batch_size: int = 4,
+                          max_input_tokens: Optional[int] = None, summarizer=None,
+                          backend: Optional[str] = None) -> Dict:
+    """Map-reduce abstractive summary covering the whole text.
+
+    The text is split on sentence boundaries into chunks that fit the model
+    window, all chunks are summarized in one batched pipeline call, and the
+    partial summaries are re-chunked and reduced until a single chunk is
+    left for the final pass. Returns the summary together with the chunk
+    count, batch size and per-stage timings.
+    """
+    summarizer = summarizer or get_abstractive_summarizer(backend)
+    tokenizer = summarizer.tokenizer
+    window = max_input_tokens or min(tokenizer.model_max_length, 1024)
+    budget = max(window - _SPECIAL_TOKEN_MARGIN, 1)
+    started = time.perf_counter()
+
+    doc = as_document(text)
+    units = doc.sentences
+    stages = []
+    first_chunk_count = None
+    previous_count = None
+    for level in range(_MAX_REDUCE_LEVELS + 1):
+        stage_started = time.perf_counter()
+        chunks = _chunk_by_tokens(units, tokenizer, budget)
+        if first_chunk_count is None:
+            first_chunk_count = len(chunks)
+        # Partials that no longer pack into fewer chunks would only be re-summarized in place
+        final = (len(chunks) <= 1 or level == _MAX_REDUCE_LEVELS
+                 or (previous_count is not None and len(chunks) >= previous_count))
+        previous_count = len(chunks)
+        if final:
+            chunks = [" ".join(chunks)] if chunks else []
+        results = summarizer(
+            chunks,
+            max_length=max_length,
+            # Partials may stop early, so they pack into fewer chunks at the next level
+            min_length=min_length if final else min(min_length, max_length // 2),
+            do_sample=False,
+            truncation=True,
+            batch_size=batch_size,
+        ) if chunks else []
+        partials = [r["summary_text"] for r in results]
+        stages.append({
+            "stage": "final" if final else ("map" if level == 0 else f"reduce-{level}"),
+            "chunks": len(chunks),
+            "seconds": time.perf_counter() - stage_started,
+        })
+        if final:
+            break
+        units = partials
+
+    return {
+        "summary": partials[0] if partials else "",
+        "chunks": first_chunk_count or 0,
+        "batch_size": batch_size,
+        "stages": stages,
+        "seconds": time.perf_counter() - started,
+    }
+
+
+# ---------- Cached Analysis ----------
+def cached_call(kind: str, func, text: TextLike, **params):
+    key = cache_key(kind, _text_of(text), **params)
+    value = analysis_cache.get(key, _MISSING)
+    if value is _MISSING:
+        value = func(text, **params)
+        analysis_cache.put(key, value)
+    return value
+
+def cached_analyze(text: TextLike) -> Dict:
+    return cached_call("analyze", lambda t: analyze(_text_of(t)), text)
+
+def cached_summarize(text: TextLike, max_length: int = 120) -> str:
+    return cached_call("extractive_summary", extractive_summarizer.summarize, text, max_length=max_length)
+
+def cache_stats() -> Dict:
+    return analysis_cache.stats()
+
+
+# ---------- Abstractive Summary Jobs ----------
+class AbstractiveJobQueue:
+    """Runs summarize_abstractive on a worker pool instead of the caller's thread.
+
+    Jobs are identified by the content hash of their text and parameters, so
+    submitting the same request twice returns the same job, and finished
+    summaries are stored in analysis_cache where any later poll finds them.
+    """
+
+    def __init__(self, max_workers: int = 1):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="abstractive")
+        self._futures = {}
+        self._cancelled = set()
+        # Re-entrant: Future.cancel() runs done-callbacks (and so _finish) on the calling thread
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def job_id(text: TextLike, max_length: int = 60, min_length: int = 20, backend: Optional[str] = None) -> str:
+        return cache_key(
+            "abstractive_summary", _text_of(text),
+            max_length=max_length, min_length=min_length, backend=backend or ABSTRACTIVE_BACKEND,
+        )
+
+    def submit(self, text: TextLike, max_length: int = 60, min_length: int = 20,
+               backend: Optional[str] = None, **kwargs) -> str:
+        text = _text_of(text)
+        job_id = self.job_id(text, max_length=max_length, min_length=min_length, backend=backend)
+        with self._lock:
+            self._cancelled.discard(job_id)
+            future = self._futures.get(job_id)
+            if future is not None and not future.done():
+                return job_id
+            if analysis_cache.get(job_id) is not None:
+                return job_id
+            future = self._executor.submit(
+                summarize_abstractive, text,
+                max_length=max_length, min_length=min_length, backend=backend, **kwargs
+            )
+            self._futures[job_id] = future
+        future.add_done_callback(lambda f: self._finish(job_id, f))
+        return job_id
+
+    def _finish(self, job_id: str, future):
+        with self._lock:
+            if job_id in self._cancelled or future.cancelled() or future.exception() is not None:
+                # Keep the future so poll()/result() can report what happened
+                return
+            self._futures.pop(job_id, None)
+        analysis_cache.put(job_id, future.result())
+
+    def poll(self, job_id: str) -> str:
+        """One of "queued", "running", "done", "failed", "cancelled" or "unknown"."""
+        with self._lock:
+            if job_id in self._cancelled:
+                return "cancelled"
+            future = self._futures.get(job_id)
+        if future is None:
+            return "done" if analysis_cache.get(job_id) is not None else "unknown"
+        if future.cancelled():
+            return "cancelled"
+        if not future.done():
+            return "running" if future.running() else "queued"
+        return "failed" if future.exception() is not None else "done"
+
+    def result(self, job_id: str, timeout: Optional[float] = None) -> Dict:
+        """Return the finished summary, waiting up to timeout; re-raises job errors."""
+        cached = analysis_cache.get(job_id)
+        if cached is not None:
+            return cached
+        with self._lock:
+            future = self._futures.get(job_id)
+        if future is None:
+            raise KeyError(f"Unknown abstractive summary job {job_id}")
+        return future.result(timeout=timeout)
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a job; a job already running finishes but its result is discarded."""
+        with self._lock:
+            future = self._futures.get(job_id)
+            if future is None or future.done():
+                return False
+            future.cancel()
+            self._cancelled.add(job_id)
+            return True
+
+abstractive_jobs = AbstractiveJobQueue()
+
+_MODULE_IMPORT_SECONDS = time.perf_counter() - _MODULE_IMPORT_STARTED
+
+if __name__ == "__main__":
+    # python text_analyzer.py → cold-start report for this module
+    ensure_nltk_data()
+    print(json.dumps(import_report(), indent=2))